@@ -5,22 +5,43 @@ Provides a high-level interface to the AGSHome security hub over the
 local network (Tuya encrypted protocol). No cloud dependency at runtime.
 """
 
+import json
 import logging
+import select
 import threading
 import time
-from typing import Any, Callable, Optional
+from typing import Any, Callable, NamedTuple, Optional, Sequence
 
 import tinytuya
 
 from .dps_map import (
     AlarmMode, VolumeLevel, DPS_ALARM_MODE, DPS_ALARM_TRIGGERED, DPS_SIREN,
     DPS_VOLUME, DPS_ZONE_1_ENABLED, DPS_ZONE_2_ENABLED,
-    DPS_SENSOR_EVENT, DPS_NOTIFICATION,
+    DPS_SENSOR_EVENT, DPS_NOTIFICATION, MODE_DPS_VALUE, VOLUME_DPS_VALUE,
+    DPS_ORDER, DPS_ORDER_UNKNOWN,
     describe_dps, decode_utf16_base64,
 )
 
 logger = logging.getLogger(__name__)
 
+# TinyTuya wizard output — where a rotated local key turns up
+DEVICES_FILE = "devices.json"
+
+# monitor_check_async() helpers: shared result for "nothing arrived" and a
+# sentinel so each DPS is probed with a single dict lookup
+_NO_EVENTS: tuple = ()
+_MISSING = object()
+
+# Shared read-only fallback for payloads without a "dps" key — never mutate
+_EMPTY_DPS: dict = {}
+
+
+class StatusResult(NamedTuple):
+    """Outcome of a hub status query (see AGSHomeHub.status_result)."""
+    ok: bool
+    dps: dict
+    error: Optional[str] = None
+
 
 class AGSHomeHub:
     """
@@ -46,22 +67,92 @@ class AGSHomeHub:
         self.local_key = local_key
         self.version = version
         self._device: Optional[tinytuya.Device] = None
-        self._listeners: list[Callable] = []
+        self._device_lock = threading.Lock()  # serialise all socket access
+        self._listeners: tuple[Callable, ...] = ()  # copy-on-write, see add_listener
         self._last_status: dict = {}
+        self._key_rejected = False          # last _try_connect() got a 914
+        self._status_cache: dict = {}       # last successful status() result
+        self._status_cache_ts = 0.0         # time.monotonic() of that result
+
+        # Monitor mode state
+        self._monitor_active = False
+        self._monitor_muted = False
+        self._monitor_silent_rearm = True
+        self._monitor_saved_volume: Optional[str] = None
+        self._monitor_rearming = False
+        self._monitor_listeners: tuple[Callable, ...] = ()  # copy-on-write
 
     def connect(self) -> bool:
         """
         Connect to the hub on the local network.
 
-        Tries the configured IP first. If that fails, runs UDP discovery
-        to find the hub by device ID (handles DHCP address changes).
+        Tries the configured IP first. If the hub answers there but rejects
+        the local key (914 — it has rotated), re-reads the key from
+        devices.json. Otherwise listens for the hub's UDP broadcast to pick
+        up a DHCP address change; if the hub isn't heard at all, gives up
+        rather than also running a full deviceScan() (only TinyTuya versions
+        without find_device() still scan).
 
         Returns True on success.
         """
         if self._try_connect(self.ip_address):
             return True
+        if self._key_rejected:
+            return self._connect_with_rediscovered_key(self.ip_address)
+
+        if getattr(tinytuya, "find_device", None) is None:
+            return self._connect_by_scan()
+
+        logger.info("Configured IP failed, listening for hub broadcast...")
+        found_ip = self._find_device_ip()
+        if not found_ip:
+            logger.error("Hub connection failed (configured IP failed and hub not heard)")
+            return False
+        if found_ip != self.ip_address:
+            if self._try_connect(found_ip):
+                logger.info(f"Hub found at new IP: {found_ip}")
+                self.ip_address = found_ip
+                return True
+            if not self._key_rejected:
+                logger.error(f"Hub connection failed (heard at {found_ip} but not answering)")
+                return False
+        # The hub is there but won't talk to us — a rotated key is the likely cause
+        return self._connect_with_rediscovered_key(found_ip)
+
+    def _connect_with_rediscovered_key(self, ip: str) -> bool:
+        """Retry `ip` with the local key from devices.json, if it has changed."""
+        new_key = self._read_local_key()
+        if not new_key or new_key == self.local_key:
+            logger.error("Hub connection failed (local key rejected, no newer key in "
+                         f"{DEVICES_FILE} — re-run the TinyTuya wizard)")
+            return False
+        logger.info(f"Applying rotated local key from {DEVICES_FILE}")
+        self.local_key = new_key
+        if self._try_connect(ip):
+            self.ip_address = ip
+            return True
+        logger.error("Hub connection failed (rotated key also rejected)")
+        return False
+
+    def _read_local_key(self) -> Optional[str]:
+        """
+        Look this hub's local key up in devices.json (TinyTuya wizard output).
 
-        # Configured IP failed — try discovery
+        deviceScan() reports keys from the same file, so this is key
+        rediscovery without a network scan. Returns None if not found.
+        """
+        try:
+            with open(DEVICES_FILE) as f:
+                devices = json.load(f)
+        except (OSError, ValueError):
+            return None
+        for device in devices:
+            if device.get("id") == self.device_id:
+                return device.get("key")
+        return None
+
+    def _connect_by_scan(self) -> bool:
+        """Find the hub with a full deviceScan() (TinyTuya without find_device())."""
         logger.info("Configured IP failed, scanning network for hub...")
         discovered_ip = self._discover_device()
         if discovered_ip and discovered_ip != self.ip_address:
@@ -85,20 +176,46 @@ class AGSHomeHub:
             device.set_socketPersistent(True)
             result = device.status()
 
-            if "Error" in result or "Err" in result:
-                logger.warning(f"Connection to {ip} failed: {result}")
+            if "Error" in result:
+                # 914: the hub answered but rejected our local key
+                self._key_rejected = result.get("Err") == "914"
+                logger.warning("Connection to %s failed: %s", ip, result)
                 return False
 
             self._device = device
+            self._key_rejected = False
             self._last_status = result.get("dps", {})
+            # Seed the status cache, so a status(max_age=...) straight after
+            # connecting reuses this reply
+            self._status_cache = dict(self._last_status)
+            self._status_cache_ts = time.monotonic()
             logger.info(f"Hub connected at {ip} (v{self.version})")
             logger.info(f"Initial DPS: {self._last_status}")
             return True
 
         except Exception as e:
-            logger.warning(f"Connection to {ip} failed: {e}")
+            self._key_rejected = False
+            logger.warning("Connection to %s failed: %s", ip, e)
             return False
 
+    def _find_device_ip(self) -> Optional[str]:
+        """
+        Listen for this hub's UDP broadcast and return its IP.
+
+        Returns on the first packet carrying our device ID, rather than
+        collecting every device for the whole deviceScan() retry window.
+        Returns None if not heard (or TinyTuya predates find_device()).
+        """
+        find_device = getattr(tinytuya, "find_device", None)
+        if find_device is None:
+            return None
+        try:
+            found = find_device(dev_id=self.device_id)
+        except Exception as e:
+            logger.warning(f"Targeted discovery failed: {e}")
+            return None
+        return found.get("ip") if found else None
+
     def _discover_device(self) -> Optional[str]:
         """Scan the local network for the hub by device ID via UDP broadcast."""
         try:
@@ -124,6 +241,7 @@ class AGSHomeHub:
             except Exception:
                 pass
             self._device = None
+            self._invalidate_status_cache()
             logger.info("Hub disconnected.")
 
     def is_connected(self) -> bool:
@@ -132,35 +250,63 @@ class AGSHomeHub:
 
     # --- Status ---
 
-    def status(self) -> dict:
+    def status_result(self, max_age: float = 0.0) -> StatusResult:
         """
         Query the hub's current DPS state.
 
-        Returns a dict of {dps_index: value}, or {"error": message} on failure.
+        Returns StatusResult(ok, dps, error): ok tells the two cases apart
+        without probing the dict. TinyTuya reports failures as
+        {"Error": ..., "Err": code, ...}, so the "Error" key alone
+        identifies them.
+
+        With max_age > 0, a successful result younger than max_age seconds
+        is returned without another round-trip to the hub. The cache is
+        dropped on every DPS write, async push and disconnect, so it never
+        outlives a change this hub object knows about.
         """
+        if max_age and time.monotonic() - self._status_cache_ts < max_age:
+            return StatusResult(True, self._status_cache)
         if not self._device:
-            return {"error": "Not connected"}
-
+            return StatusResult(False, _EMPTY_DPS, "Not connected")
         try:
-            result = self._device.status()
-            if "Error" in result or "Err" in result:
-                return {"error": str(result)}
-            return result.get("dps", {})
+            with self._device_lock:
+                result = self._device.status()
+            if "Error" in result:
+                return StatusResult(False, _EMPTY_DPS, str(result))
+            dps = result.get("dps", _EMPTY_DPS)
+            self._status_cache = dps
+            self._status_cache_ts = time.monotonic()
+            return StatusResult(True, dps)
         except Exception as e:
-            return {"error": str(e)}
+            return StatusResult(False, _EMPTY_DPS, str(e))
+
+    def _invalidate_status_cache(self):
+        """Forget the cached status_result() — the hub's DPS may have changed."""
+        self._status_cache_ts = 0.0
+
+    def status(self, max_age: float = 0.0) -> dict:
+        """
+        Query the hub's current DPS state.
+
+        Returns a {dps_index: value} dict, or {"error": message} on failure.
+        See status_result() for max_age.
+        """
+        res = self.status_result(max_age)
+        return res.dps if res.ok else {"error": res.error}
 
-    def status_pretty(self) -> list[str]:
-        """Return human-readable status lines."""
-        dps = self.status()
-        if "error" in dps:
-            return [f"Error: {dps['error']}"]
-        return [describe_dps(idx, val) for idx, val in sorted(dps.items())]
+    def status_pretty(self, max_age: float = 0.0) -> list[str]:
+        """Return human-readable status lines (see status_result() for max_age)."""
+        res = self.status_result(max_age)
+        if not res.ok:
+            return [f"Error: {res.error}"]
+        items = sorted(res.dps.items(), key=lambda kv: DPS_ORDER.get(kv[0], DPS_ORDER_UNKNOWN))
+        return [describe_dps(idx, val) for idx, val in items]
 
     # --- Control ---
 
     def set_mode(self, mode: AlarmMode) -> bool:
         """Set the alarm mode (away, home, disarmed)."""
-        return self._set_dps(DPS_ALARM_MODE, mode.value)
+        return self._set_dps(DPS_ALARM_MODE, MODE_DPS_VALUE[mode])
 
     def trigger_siren(self, on: bool = True) -> bool:
         """Turn the siren on or off (DPS 104)."""
@@ -172,7 +318,7 @@ class AGSHomeHub:
 
     def set_volume(self, level: VolumeLevel) -> bool:
         """Set the hub volume level."""
-        return self._set_dps(DPS_VOLUME, level.value)
+        return self._set_dps(DPS_VOLUME, VOLUME_DPS_VALUE[level])
 
     def set_dps_value(self, index: str, value: Any) -> bool:
         """Set an arbitrary DPS value (for testing/discovery)."""
@@ -180,17 +326,33 @@ class AGSHomeHub:
 
     def _set_dps(self, index: str, value: Any) -> bool:
         """Send a DPS value to the hub."""
-        if not self._device:
-            logger.error("Not connected")
-            return False
-
-        try:
-            result = self._device.set_value(index, value)
-            logger.info(f"Set DPS {index} = {value} -> {result}")
-            return True
-        except Exception as e:
-            logger.error(f"Failed to set DPS {index}: {e}")
-            return False
+        with self._device_lock:
+            if not self._device:
+                logger.error("Not connected")
+                return False
+            try:
+                result = self._device.set_value(index, value)
+            except Exception as e:
+                logger.error("Failed to set DPS %s: %s", index, e)
+                return False
+        self._invalidate_status_cache()
+        logger.info(f"Set DPS {index} = {value} -> {result}")
+        return True
+
+    def _set_multiple_dps(self, values: dict[str, Any]) -> bool:
+        """Send several DPS values to the hub in a single frame."""
+        with self._device_lock:
+            if not self._device:
+                logger.error("Not connected")
+                return False
+            try:
+                result = self._device.set_multiple_values(values)
+            except Exception as e:
+                logger.error("Failed to set DPS %s: %s", list(values), e)
+                return False
+        self._invalidate_status_cache()
+        logger.info(f"Set DPS {values} -> {result}")
+        return True
 
     # --- Listeners ---
 
@@ -200,7 +362,8 @@ class AGSHomeHub:
 
         Callback signature: callback(dps_index, new_value, old_value)
         """
-        self._listeners.append(callback)
+        # Rebind a new tuple so poll threads iterate a stable snapshot
+        self._listeners = self._listeners + (callback,)
 
     def _fire_listeners(self, index: str, new_value: Any, old_value: Any):
         """Notify all listeners of a DPS change."""
@@ -208,7 +371,7 @@ class AGSHomeHub:
             try:
                 listener(index, new_value, old_value)
             except Exception as e:
-                logger.error(f"Listener error: {e}")
+                logger.error("Listener error: %s", e)
 
     # --- Polling ---
 
@@ -218,16 +381,25 @@ class AGSHomeHub:
 
         Returns the current DPS dict.
         """
-        current = self.status()
-        if "error" in current:
-            return current
+        res = self.status_result()
+        if not res.ok:
+            return {"error": res.error}
+        current = res.dps
 
+        last = self._last_status
+        listeners = self._listeners
         for idx, val in current.items():
-            old = self._last_status.get(idx)
+            old = last.get(idx)
             if old is not None and old != val:
-                self._fire_listeners(idx, val, old)
-
-        self._last_status = dict(current)
+                for listener in listeners:
+                    try:
+                        listener(idx, val, old)
+                    except Exception as e:
+                        logger.error("Listener error: %s", e)
+
+        # status() hands back the "dps" dict from a freshly decoded TinyTuya
+        # payload that nothing else holds, so keep it rather than copying
+        self._last_status = current
         return current
 
     def poll_loop(self, interval: float = 5.0):
@@ -243,26 +415,14 @@ class AGSHomeHub:
 
     # --- Monitor Mode ---
 
-    def __init_monitor_state(self):
-        """Initialise monitor mode state (called lazily)."""
-        if not hasattr(self, "_monitor_active"):
-            self._monitor_active = False
-            self._monitor_muted = False
-            self._monitor_silent_rearm = True
-            self._monitor_saved_volume: Optional[str] = None
-            self._monitor_rearming = False
-            self._monitor_listeners: list[Callable] = []
-
     @property
     def monitor_active(self) -> bool:
         """Whether monitor mode is currently running."""
-        self.__init_monitor_state()
         return self._monitor_active
 
     @property
     def monitor_muted(self) -> bool:
         """Whether monitor mode is running with muted volume."""
-        self.__init_monitor_state()
         return self._monitor_muted
 
     def add_monitor_listener(self, callback: Callable[[str, str], None]):
@@ -272,17 +432,15 @@ class AGSHomeHub:
         Callback signature: callback(event_type, message)
         event_type is one of: "sensor", "rearm", "silence", "info"
         """
-        self.__init_monitor_state()
-        self._monitor_listeners.append(callback)
+        self._monitor_listeners = self._monitor_listeners + (callback,)
 
     def _notify_monitor(self, event_type: str, message: str):
         """Notify all monitor listeners."""
-        self.__init_monitor_state()
         for listener in self._monitor_listeners:
             try:
                 listener(event_type, message)
             except Exception as e:
-                logger.error(f"Monitor listener error: {e}")
+                logger.error("Monitor listener error: %s", e)
 
     def start_monitor(self, muted: bool = False, silent_rearm: bool = True):
         """
@@ -303,7 +461,6 @@ class AGSHomeHub:
 
         Call stop_monitor() to exit.
         """
-        self.__init_monitor_state()
         if self._monitor_active:
             logger.warning("Monitor mode already active")
             return
@@ -314,9 +471,9 @@ class AGSHomeHub:
 
         # If muted, save current volume and set to mute
         if muted:
-            status = self.status()
-            if "error" not in status:
-                self._monitor_saved_volume = status.get(DPS_VOLUME)
+            res = self.status_result()
+            if res.ok:
+                self._monitor_saved_volume = res.dps.get(DPS_VOLUME)
             self.set_volume(VolumeLevel.MUTE)
             logger.info("Monitor: volume muted")
             self._notify_monitor("info", "Volume muted")
@@ -329,7 +486,6 @@ class AGSHomeHub:
 
     def stop_monitor(self):
         """Exit monitor mode and disarm the hub."""
-        self.__init_monitor_state()
         if not self._monitor_active:
             return
 
@@ -347,64 +503,108 @@ class AGSHomeHub:
         logger.info("Monitor mode stopped (hub disarmed)")
         self._notify_monitor("info", "Monitor mode stopped")
 
-    def monitor_check_async(self) -> list[dict]:
+    def _async_data_pending(self, timeout: float = 0.0) -> bool:
+        """
+        select() on the hub socket for up to `timeout` seconds (default: poll).
+
+        receive() is only worth calling when a push packet is waiting; once
+        it is, the 0.1s socket timeout just covers the rest of the frame.
+        Without an open socket there is nothing to select() on: sleep for
+        `timeout` instead and let receive() open one, so a listener thread
+        makes one short connection per wait rather than reconnecting back
+        to back.
+        """
+        sock = getattr(self._device, "socket", None)
+        if sock is None:
+            if timeout:
+                time.sleep(timeout)
+            return True
+        readable, _, _ = select.select([sock], [], [], timeout)
+        return bool(readable)
+
+    def _receive_push(self) -> Any:
+        """
+        receive() one pushed packet with a short socket timeout.
+
+        The device's own timeout is restored afterwards, so command replies
+        on the same device still get the full wait. Call with _device_lock held.
+        """
+        device = self._device
+        saved_timeout = device.connection_timeout
+        device.set_socketTimeout(0.1)
+        try:
+            return device.receive()
+        finally:
+            device.set_socketTimeout(saved_timeout)
+
+    def monitor_check_async(self, wait: float = 0.0) -> Sequence[dict]:
         """
         Check for async events from the hub and handle monitor logic.
 
         Returns a list of event dicts: [{"type": str, "message": str, "dps": dict}]
-        Call this frequently (every 200-500ms) for responsive monitoring.
+        (a shared empty tuple when nothing arrived).
+        Call this frequently (every 200-500ms) for responsive monitoring,
+        or pass `wait` to block up to that many seconds for a packet.
+        Raises on socket or hub errors (including TinyTuya's {"Error": ...}
+        results) so the caller can back off.
         """
-        self.__init_monitor_state()
-        events = []
 
         if not self._device:
-            return events
+            return _NO_EVENTS
+
+        # Block outside the lock so commands aren't held up by the wait
+        if wait and not self._async_data_pending(wait):
+            return _NO_EVENTS
+        with self._device_lock:
+            if not self._async_data_pending():
+                return _NO_EVENTS
+            data = self._receive_push()
+        if not data or not isinstance(data, dict):
+            return _NO_EVENTS
+        if "Error" in data:
+            # TinyTuya reports connect/decode failures as a dict, not an exception
+            raise ConnectionError(data["Error"])
+
+        dps = data.get("dps", _EMPTY_DPS)
+        if not dps and "data" in data:
+            dps = data["data"].get("dps", _EMPTY_DPS)
+        if not dps:
+            return _NO_EVENTS
+
+        self._invalidate_status_cache()
+        logger.debug(f"Async DPS received: {dps}")
+        events = []
 
-        try:
-            self._device.set_socketTimeout(0.1)
-            data = self._device.receive()
-            if not data or not isinstance(data, dict):
-                return events
-
-            dps = data.get("dps", {})
-            if not dps and "data" in data:
-                dps = data["data"].get("dps", {})
-            if not dps:
-                return events
-
-            logger.debug(f"Async DPS received: {dps}")
-
-            # Sensor event (DPS 116 — may or may not arrive via async)
-            if DPS_SENSOR_EVENT in dps:
-                sensor_name = decode_utf16_base64(dps[DPS_SENSOR_EVENT])
-                events.append({"type": "sensor", "message": sensor_name, "dps": dps})
-                logger.info(f"Monitor: sensor event — {sensor_name}")
-                self._notify_monitor("sensor", sensor_name)
-
-            # Notification (DPS 121 — often contains sensor name)
-            if DPS_NOTIFICATION in dps:
-                notification = decode_utf16_base64(dps[DPS_NOTIFICATION])
-                events.append({"type": "notification", "message": notification, "dps": dps})
-
-            # Alarm triggered (DPS 103) — primary trigger for monitor re-arm
-            if DPS_ALARM_TRIGGERED in dps:
-                triggered = dps[DPS_ALARM_TRIGGERED]
-                events.append({"type": "triggered", "message": str(triggered), "dps": dps})
-
-                # In monitor mode: silence siren and re-arm in background thread
-                if triggered and self._monitor_active and not self._monitor_rearming:
-                    threading.Thread(
-                        target=self._monitor_rearm_sequence,
-                        daemon=True,
-                    ).start()
-
-            # Mode change
-            if DPS_ALARM_MODE in dps:
-                mode_val = dps[DPS_ALARM_MODE]
-                events.append({"type": "mode", "message": mode_val, "dps": dps})
-
-        except Exception:
-            pass
+        # Sensor event (DPS 116 — may or may not arrive via async)
+        sensor = dps.get(DPS_SENSOR_EVENT, _MISSING)
+        if sensor is not _MISSING:
+            sensor_name = decode_utf16_base64(sensor)
+            events.append({"type": "sensor", "message": sensor_name, "dps": dps})
+            logger.info(f"Monitor: sensor event — {sensor_name}")
+            self._notify_monitor("sensor", sensor_name)
+
+        # Notification (DPS 121 — often contains sensor name)
+        notification = dps.get(DPS_NOTIFICATION, _MISSING)
+        if notification is not _MISSING:
+            notification = decode_utf16_base64(notification)
+            events.append({"type": "notification", "message": notification, "dps": dps})
+
+        # Alarm triggered (DPS 103) — primary trigger for monitor re-arm
+        triggered = dps.get(DPS_ALARM_TRIGGERED, _MISSING)
+        if triggered is not _MISSING:
+            events.append({"type": "triggered", "message": str(triggered), "dps": dps})
+
+            # In monitor mode: silence siren and re-arm in background thread
+            if triggered and self._monitor_active and not self._monitor_rearming:
+                threading.Thread(
+                    target=self._monitor_rearm_sequence,
+                    daemon=True,
+                ).start()
+
+        # Mode change
+        mode_val = dps.get(DPS_ALARM_MODE, _MISSING)
+        if mode_val is not _MISSING:
+            events.append({"type": "mode", "message": mode_val, "dps": dps})
 
         return events
 
@@ -426,17 +626,19 @@ class AGSHomeHub:
 
             if self._monitor_silent_rearm:
                 # SILENT re-arm: direct DPS writes (no mode change = no beep)
-                logger.info("Monitor: clearing trigger (silent)...")
-                self._set_dps(DPS_ALARM_TRIGGERED, False)
-                time.sleep(0.3)
-
+                # Trigger clear and zone re-enable go out as one frame
                 if self._monitor_active:
-                    logger.info("Monitor: re-enabling zones...")
-                    self._set_dps(DPS_ZONE_1_ENABLED, True)
-                    time.sleep(0.2)
-                    self._set_dps(DPS_ZONE_2_ENABLED, True)
+                    logger.info("Monitor: clearing trigger and re-enabling zones (silent)...")
+                    self._set_multiple_dps({
+                        DPS_ALARM_TRIGGERED: False,
+                        DPS_ZONE_1_ENABLED: True,
+                        DPS_ZONE_2_ENABLED: True,
+                    })
                     self._notify_monitor("rearm", "Re-armed (silent)")
                     logger.info("Monitor: re-arm complete (silent)")
+                else:
+                    logger.info("Monitor: clearing trigger (silent)...")
+                    self._set_dps(DPS_ALARM_TRIGGERED, False)
             else:
                 # NORMAL re-arm: disarm then re-arm (hub beeps — wanted)
                 logger.info("Monitor: normal disarm/re-arm cycle...")
@@ -448,7 +650,7 @@ class AGSHomeHub:
                     self._notify_monitor("rearm", "Re-armed")
                     logger.info("Monitor: re-arm complete (normal)")
         except Exception as e:
-            logger.error(f"Monitor re-arm error: {e}")
+            logger.error("Monitor re-arm error: %s", e)
         finally:
             self._monitor_rearming = False
 
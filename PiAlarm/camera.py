@@ -8,7 +8,7 @@ local network. This module provides:
   - RTSP stream connection and frame capture
   - Threaded background streaming (non-blocking)
   - Snapshot capture and saving
-  - Motion detection (basic frame differencing)
+  - Motion detection (three-frame differencing)
   - Integration hooks for the AGSHome alarm system
 
 RTSP URL format for O-KAM cameras:
@@ -17,18 +17,35 @@ RTSP URL format for O-KAM cameras:
 
 Some models may use different ports (554, 8554) or require credentials.
 Use discover_camera.py to probe your specific camera.
+
+Motion mask:
+  CameraConfig.motion_mask limits motion detection to part of the view.
+  It must be a uint8 array at the downsampled motion resolution
+  (MOTION_FRAME_SIZE, i.e. shape (240, 320)), non-zero where motion
+  counts. It is applied with cv2.bitwise_and — avoid numpy.where or
+  boolean indexing here, which are far slower on the Pi.
 """
 
 import logging
 import os
 import threading
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-from datetime import datetime
 from typing import Any, Callable, Optional
 
 logger = logging.getLogger(__name__)
 
+# FFMPEG options for RTSP: TCP transport, and emit packets immediately
+# rather than buffering for stream probing. FFMPEG reads these when a
+# VideoCapture is opened, so set them once before cv2 is used (an
+# existing environment value wins).
+FFMPEG_CAPTURE_OPTIONS = (
+    "rtsp_transport;tcp|buffer_size;102400|max_delay;500000|fflags;nobuffer"
+)
+os.environ.setdefault("OPENCV_FFMPEG_CAPTURE_OPTIONS", FFMPEG_CAPTURE_OPTIONS)
+
 try:
     import cv2
     CV2_AVAILABLE = True
@@ -44,7 +61,6 @@ try:
 except ImportError:
     NUMPY_AVAILABLE = False
 
-
 @dataclass
 class CameraConfig:
     """Configuration for an O-KAM camera."""
@@ -59,6 +75,7 @@ class CameraConfig:
     connection_timeout: int = 10
     reconnect_delay: float = 5.0
     max_reconnect_attempts: int = 5
+    motion_mask: Optional[Any] = None  # uint8 ndarray at MOTION_FRAME_SIZE, see module docs
 
     @property
     def rtsp_url(self) -> str:
@@ -69,6 +86,46 @@ class CameraConfig:
         return f"rtsp://{self.ip_address}:{self.rtsp_port}/{path}"
 
 
+# Default FFMPEG frame queue depth — the most frames read_latest_frame()
+# will drain (the backend may ignore CAP_PROP_BUFFERSIZE)
+CAPTURE_QUEUE_DEPTH = 4
+
+# A grab() slower than this waited for the camera, so it got a live frame
+# rather than one already queued
+GRAB_BLOCK_SECONDS = 0.005
+
+
+def _limit_capture_buffer(capture) -> bool:
+    """
+    Ask the capture backend to keep only the newest frame queued.
+
+    Returns False if the backend does not honour CAP_PROP_BUFFERSIZE.
+    """
+    try:
+        return bool(capture.set(cv2.CAP_PROP_BUFFERSIZE, 1))
+    except Exception:
+        return False
+
+
+# Capture buffers reused by read_frame() — a published frame survives
+# FRAME_RING_SIZE - 1 further reads before it is overwritten
+FRAME_RING_SIZE = 3
+
+# JPEG quality for saved snapshots and in-memory previews
+SNAPSHOT_JPEG_QUALITY = 85
+PREVIEW_JPEG_QUALITY = 80
+
+
+# Upper bound for the stream loop's exponential reconnect backoff (seconds)
+MAX_RECONNECT_DELAY = 30.0
+
+
+# Motion detection runs on a downsampled copy of each frame
+MOTION_FRAME_SIZE = (320, 240)   # (width, height)
+MOTION_PIXEL_THRESHOLD = 25      # per-pixel grey-level change counted as motion
+MOTION_BLUR_KSIZE = (5, 5)       # box filter — coarse noise suppression is enough
+
+
 # Common RTSP URL patterns to try during discovery
 RTSP_URL_PATTERNS = [
     # O-KAM / Vstarcam standard
@@ -100,13 +157,33 @@ class OKamCamera:
     def __init__(self, config: CameraConfig):
         self.config = config
         self._capture: Optional[Any] = None  # cv2.VideoCapture
+        self._rtsp_url: Optional[str] = None  # cached at connect()
         self._streaming = False
         self._stream_thread: Optional[threading.Thread] = None
+        self._consumer_thread: Optional[threading.Thread] = None
+        # Capture -> consumer handoff; maxlen evicts stale frames for free
+        self._consume_q: deque = deque(maxlen=2)
+        self._consume_evt = threading.Event()
+        # Reusable frame buffers: capture decodes into the next slot and then
+        # publishes it by swapping the _latest_frame reference (atomic under
+        # the GIL, so readers of the frame alone need no lock; the frame
+        # and _frame_count are updated together under _frame_cond)
         self._latest_frame = None
-        self._frame_lock = threading.Lock()
+        # Notified on every published frame; wait_jpeg() viewers block on it
+        self._frame_cond = threading.Condition()
+        # (frame_count, quality, bytes) of the last shared encode
+        self._jpeg_cache: tuple = (0, 0, b"")
+        self._jpeg_lock = threading.Lock()
+        self._ring: list = [None] * FRAME_RING_SIZE
+        self._ring_idx = 0
         self._frame_count = 0
         self._motion_listeners: list[Callable] = []
-        self._previous_frame_gray = None
+        # Motion buffers (see _alloc_motion_buffers): gray frames and changed
+        # masks alternate between two slots; _gray_idx is the slot to write
+        self._gray_bufs: list = [None, None]
+        self._changed_bufs: list = [None, None]
+        self._gray_idx = 0
+        self._motion_frames = 0  # gray frames seen, capped at 3
 
     def connect(self) -> bool:
         """
@@ -118,13 +195,11 @@ class OKamCamera:
             logger.error("OpenCV not installed. Run: pip install opencv-python")
             return False
 
-        url = self.config.rtsp_url
+        url = self._rtsp_url = self.config.rtsp_url
         logger.info(f"Connecting to camera at: {url}")
 
-        # Set FFMPEG options for better RTSP handling
-        os.environ["OPENCV_FFMPEG_CAPTURE_OPTIONS"] = "rtsp_transport;tcp"
-
         capture = cv2.VideoCapture(url, cv2.CAP_FFMPEG)
+        _limit_capture_buffer(capture)
         capture.set(cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, self.config.connection_timeout * 1000)
         capture.set(cv2.CAP_PROP_READ_TIMEOUT_MSEC, 10000)
 
@@ -167,52 +242,175 @@ class OKamCamera:
         """
         Read a single frame from the camera.
 
-        Returns a numpy array (BGR image) or None on failure.
+        Returns a numpy array (BGR image) or None on failure. The array is
+        one of FRAME_RING_SIZE reused capture buffers and is overwritten
+        FRAME_RING_SIZE reads later; copy it if it must outlive that.
         """
-        if not self.is_connected():
+        if not self.is_connected() or not self._capture.grab():
             return None
+        return self._retrieve_frame()
 
-        ret, frame = self._capture.read()
+    def read_latest_frame(self):
+        """
+        Read the newest frame, discarding any the backend has queued.
+
+        Queued frames come back from grab() almost at once; the first grab()
+        that takes longer than GRAB_BLOCK_SECONDS had to wait for the
+        camera, so only that one is decoded. Returns None on failure.
+        """
+        if not self.is_connected():
+            return None
+        for _ in range(CAPTURE_QUEUE_DEPTH + 1):
+            start = time.perf_counter()
+            if not self._capture.grab():
+                return None
+            if time.perf_counter() - start > GRAB_BLOCK_SECONDS:
+                break
+        return self._retrieve_frame()
+
+    def _retrieve_frame(self):
+        """
+        Decode the most recently grabbed frame into the next ring buffer
+        and publish it as the latest frame. Returns it, or None on failure.
+        """
+        slot = self._ring_idx
+        ret, frame = self._capture.retrieve(self._ring[slot])
         if ret and frame is not None:
-            self._frame_count += 1
-            with self._frame_lock:
-                self._latest_frame = frame.copy()
+            # retrieve() reallocates if the stream resolution changed
+            self._ring[slot] = frame
+            self._ring_idx = (slot + 1) % FRAME_RING_SIZE
+            # Count and frame change together under the condition's lock, so
+            # wait_jpeg() never pairs one frame with another frame's number
+            with self._frame_cond:
+                self._frame_count += 1
+                self._latest_frame = frame
+                self._frame_cond.notify_all()
             return frame
         return None
 
+    def _snapshot_frame(self):
+        """
+        Get a fresh frame for a snapshot.
+
+        While streaming, the capture belongs to the stream thread, so the
+        latest published frame is used; otherwise a new frame is read.
+        """
+        if self._streaming:
+            return self._latest_frame
+        return self.read_latest_frame()
+
+    @staticmethod
+    def _encode_jpeg(frame, quality: int = PREVIEW_JPEG_QUALITY,
+                     optimize: bool = False) -> bytes:
+        """Encode a BGR frame as JPEG bytes. Returns b"" on failure."""
+        params = [int(cv2.IMWRITE_JPEG_QUALITY), quality]
+        if optimize:
+            params += [int(cv2.IMWRITE_JPEG_OPTIMIZE), 1]
+        ok, encoded = cv2.imencode(".jpg", frame, params)
+        return encoded.tobytes() if ok else b""
+
     def snapshot(self, save_path: str = None) -> Optional[str]:
         """
-        Take a snapshot and optionally save to disk.
+        Take a snapshot and save it to disk as JPEG.
 
         Args:
             save_path: File path to save the image (e.g. "snapshot.jpg").
                        If None, generates a timestamped filename.
 
         Returns the file path of the saved image, or None on failure.
+        Use snapshot_bytes() when no file is needed.
         """
-        frame = self.read_frame()
+        frame = self._snapshot_frame()
         if frame is None:
             logger.error("Could not capture snapshot")
             return None
 
+        data = self._encode_jpeg(frame, SNAPSHOT_JPEG_QUALITY, optimize=True)
+        if not data:
+            logger.error("Could not encode snapshot")
+            return None
+
         if save_path is None:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            save_path = f"snapshot_{timestamp}.jpg"
+            save_path = time.strftime("snapshot_%Y%m%d_%H%M%S.jpg")
 
-        cv2.imwrite(save_path, frame)
+        with open(save_path, "wb") as f:
+            f.write(data)
         logger.info(f"Snapshot saved: {save_path}")
         return save_path
 
+    def snapshot_bytes(self, quality: int = PREVIEW_JPEG_QUALITY) -> bytes:
+        """
+        Take a snapshot and return it as JPEG bytes without touching disk.
+
+        Returns b"" on failure.
+        """
+        frame = self._snapshot_frame()
+        if frame is None:
+            logger.error("Could not capture snapshot")
+            return b""
+        return self._encode_jpeg(frame, quality)
+
+    def cached_jpeg(self, max_lag: int = 3) -> bytes:
+        """
+        Return the JPEG last shared with wait_jpeg() viewers, without encoding.
+
+        Only returned if it is at most `max_lag` frames behind the latest
+        (about 200 ms at 15 FPS); otherwise b"", and the caller should fall
+        back to snapshot_bytes().
+        """
+        seq, _quality, data = self._jpeg_cache
+        if data and self._frame_count - seq <= max_lag:
+            return data
+        return b""
+
     def get_latest_frame(self):
-        """Get the most recent frame (thread-safe, for use with background streaming)."""
-        with self._frame_lock:
-            return self._latest_frame.copy() if self._latest_frame is not None else None
+        """
+        Get the most recent frame (lock-free, for use with background streaming).
+
+        Returns the published capture buffer itself, not a copy. It stays
+        intact while at least FRAME_RING_SIZE - 1 further frames are decoded
+        (over 100 ms at 15 FPS) — enough to JPEG-encode it. Callers that keep
+        or modify the frame must copy it first.
+        """
+        return self._latest_frame
+
+    def wait_jpeg(self, after: int = 0, quality: int = PREVIEW_JPEG_QUALITY,
+                  timeout: float = 1.0) -> tuple[int, bytes]:
+        """
+        Wait for a frame newer than `after` and return (frame_count, JPEG).
+
+        For MJPEG viewers while streaming: each published frame is encoded
+        at most once per quality, however many viewers are waiting, and
+        nothing is encoded while nobody asks. Pass the returned frame_count
+        back as `after` to get the next frame. Returns (after, b"") if no
+        new frame arrives within `timeout`.
+        """
+        with self._frame_cond:
+            if not self._frame_cond.wait_for(
+                    lambda: self._frame_count > after, timeout):
+                return after, b""
+            seq = self._frame_count
+            frame = self._latest_frame
+        with self._jpeg_lock:
+            cached_seq, cached_quality, data = self._jpeg_cache
+            if cached_quality == quality and cached_seq >= seq:
+                # Another viewer already encoded this frame (or a newer one)
+                seq = cached_seq
+            else:
+                data = self._encode_jpeg(frame, quality) if frame is not None else b""
+                self._jpeg_cache = (seq, quality, data)
+        return seq, data
 
     # --- Background Streaming ---
 
     def start_stream(self, display: bool = False, fps_limit: float = 15.0):
         """
-        Start background streaming thread.
+        Start background streaming.
+
+        A capture thread keeps the RTSP stream drained and hands frames to a
+        consumer thread (motion detection, display) through a 2-slot
+        overwriting queue, so slow consumers drop stale frames instead of
+        stalling capture.
 
         Args:
             display: If True, show a live video window (requires display).
@@ -223,55 +421,110 @@ class OKamCamera:
             return
 
         self._streaming = True
+        self._consume_q.clear()
+        self._consume_evt.clear()
         self._stream_thread = threading.Thread(
             target=self._stream_loop,
             args=(display, fps_limit),
             daemon=True,
         )
+        self._consumer_thread = threading.Thread(
+            target=self._consumer_loop,
+            args=(display,),
+            daemon=True,
+        )
         self._stream_thread.start()
+        self._consumer_thread.start()
         logger.info("Background streaming started")
 
     def stop_stream(self):
-        """Stop the background streaming thread."""
+        """Stop the background streaming threads."""
         if self._streaming:
             self._streaming = False
-            if self._stream_thread:
-                self._stream_thread.join(timeout=5)
-                self._stream_thread = None
+            self._consume_evt.set()  # wake the consumer so it can exit
+            for thread in (self._stream_thread, self._consumer_thread):
+                if thread:
+                    thread.join(timeout=5)
+            self._stream_thread = None
+            self._consumer_thread = None
             logger.info("Background streaming stopped")
 
     def _stream_loop(self, display: bool, fps_limit: float):
-        """Internal streaming loop (runs in background thread)."""
+        """Internal capture loop (runs in background thread)."""
         frame_interval = 1.0 / fps_limit if fps_limit > 0 else 0
         reconnect_attempts = 0
 
         while self._streaming:
-            start_time = time.time()
+            deadline = time.time() + frame_interval
+
+            # FPS limiting: grab() only demuxes/queues a frame, so keep
+            # grabbing until the frame budget is used up and convert just
+            # the newest one with retrieve()
+            grabbed = self.is_connected() and self._capture.grab()
+            while grabbed and self._streaming and time.time() < deadline:
+                grabbed = self._capture.grab()
 
-            frame = self.read_frame()
+            frame = self._retrieve_frame() if grabbed else None
             if frame is None:
+                # Transient read failure — a few quick grab() retries avoid
+                # a full FFMPEG demuxer restart
+                if not grabbed and self._retry_grab():
+                    continue
+
                 # Connection lost - attempt reconnect
                 reconnect_attempts += 1
                 if reconnect_attempts > self.config.max_reconnect_attempts:
                     logger.error("Max reconnect attempts reached. Stopping.")
                     self._streaming = False
+                    self._consume_evt.set()
                     break
 
+                delay = min(
+                    self.config.reconnect_delay * 2 ** (reconnect_attempts - 1),
+                    MAX_RECONNECT_DELAY,
+                )
                 logger.warning(
-                    f"Frame read failed. Reconnecting "
+                    f"Frame read failed. Reconnecting in {delay:.0f}s "
                     f"({reconnect_attempts}/{self.config.max_reconnect_attempts})..."
                 )
-                time.sleep(self.config.reconnect_delay)
+                time.sleep(delay)
 
                 if self._capture:
                     self._capture.release()
                 self._capture = cv2.VideoCapture(
-                    self.config.rtsp_url, cv2.CAP_FFMPEG
+                    self._rtsp_url or self.config.rtsp_url, cv2.CAP_FFMPEG
                 )
+                _limit_capture_buffer(self._capture)
                 continue
 
             reconnect_attempts = 0
 
+            if display or self._motion_listeners:
+                self._consume_q.append(frame)
+                self._consume_evt.set()
+
+    def _retry_grab(self, attempts: int = 3) -> bool:
+        """Retry grab() briefly on the existing capture. Returns True if one succeeds."""
+        if not self.is_connected():
+            return False
+        for _ in range(attempts):
+            if self._capture.grab():
+                return True
+            time.sleep(0.05)
+        return False
+
+    def _consumer_loop(self, display: bool):
+        """Internal consumer loop: motion detection and display (background thread)."""
+        while self._streaming:
+            if not self._consume_evt.wait(timeout=0.5):
+                continue
+            self._consume_evt.clear()
+            try:
+                frame = self._consume_q.pop()  # newest; older ones are stale
+            except IndexError:
+                continue
+            self._consume_q.clear()
+
             # Check for motion
             self._check_motion(frame)
 
@@ -282,11 +535,6 @@ class OKamCamera:
                     self._streaming = False
                     break
 
-            # FPS limiting
-            elapsed = time.time() - start_time
-            if elapsed < frame_interval:
-                time.sleep(frame_interval - elapsed)
-
         if display:
             cv2.destroyWindow(self.config.name)
 
@@ -297,39 +545,100 @@ class OKamCamera:
         Register a callback for motion events.
 
         Callback signature: callback(motion_score, frame)
-        motion_score is a float 0-100 indicating intensity of motion.
+        motion_score is a float 0-100: the percentage of the frame that changed.
+        frame is a copy, not a capture buffer, so listeners may keep it
+        (save, record, queue) — it is shared by all listeners for that
+        event, so copy it again before modifying it.
         """
         self._motion_listeners.append(callback)
 
+    def _alloc_motion_buffers(self):
+        """Allocate the reusable buffers for the downsampled motion path."""
+        width, height = MOTION_FRAME_SIZE
+        shape = (height, width)
+        self._small_buf = np.empty((height, width, 3), np.uint8)
+        self._gray_raw_buf = np.empty(shape, np.uint8)
+        self._gray_bufs = [np.empty(shape, np.uint8), np.empty(shape, np.uint8)]
+        self._changed_bufs = [np.empty(shape, np.uint8), np.empty(shape, np.uint8)]
+        self._diff_buf = np.empty(shape, np.uint8)
+        self._motion_buf = np.empty(shape, np.uint8)
+        # Pixels outside the mask are never written, so start them at zero
+        self._masked_diff_buf = np.zeros(shape, np.uint8)
+
     def _check_motion(self, frame, threshold: float = 5.0):
         """
-        Simple motion detection via frame differencing.
-
-        Compares the current frame to the previous one and calculates
-        the mean absolute difference. If above threshold, fires listeners.
+        Motion detection via three-frame differencing.
+
+        Works on a downsampled grayscale copy of the frame. Pixels whose
+        absolute difference from the previous frame exceeds
+        MOTION_PIXEL_THRESHOLD count as changed. Pixels that also changed
+        between the two frames before that (the intersection) are removed,
+        which suppresses stationary-background flicker and ghosting. If the
+        remaining changed share of the frame (percent) is above threshold,
+        fires listeners.
+
+        All intermediates are written into preallocated buffers; the
+        current/previous gray frame and changed mask swap slots by index.
         """
         if not NUMPY_AVAILABLE or not self._motion_listeners:
             return
 
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        gray = cv2.GaussianBlur(gray, (21, 21), 0)
+        if self._gray_bufs[0] is None:
+            self._alloc_motion_buffers()
+
+        cur = self._gray_idx
+        prev = cur ^ 1
+
+        if frame.ndim == 2:
+            # Luma-only frame (e.g. a decoder's Y plane) — already grayscale,
+            # so downsample straight into the gray buffer
+            cv2.resize(
+                frame, MOTION_FRAME_SIZE, dst=self._gray_raw_buf,
+                interpolation=cv2.INTER_AREA,
+            )
+        else:
+            small = cv2.resize(
+                frame, MOTION_FRAME_SIZE, dst=self._small_buf,
+                interpolation=cv2.INTER_AREA,
+            )
+            cv2.cvtColor(small, cv2.COLOR_BGR2GRAY, dst=self._gray_raw_buf)
+        gray = cv2.blur(self._gray_raw_buf, MOTION_BLUR_KSIZE, dst=self._gray_bufs[cur])
+
+        self._gray_idx = prev
+        if self._motion_frames < 3:
+            self._motion_frames += 1
+        if self._motion_frames < 2:
+            return
 
-        if self._previous_frame_gray is None:
-            self._previous_frame_gray = gray
+        # d2 = |F(k) - F(k-1)|; d1 = |F(k-1) - F(k-2)| is last call's d2
+        previous_gray = self._gray_bufs[prev]
+        changed = self._changed_bufs[cur]
+        previous_changed = self._changed_bufs[prev] if self._motion_frames > 2 else None
+        mask = self.config.motion_mask
+        diff = cv2.absdiff(previous_gray, gray, dst=self._diff_buf)
+        if mask is not None:
+            diff = cv2.bitwise_and(diff, diff, dst=self._masked_diff_buf, mask=mask)
+        cv2.threshold(
+            diff, MOTION_PIXEL_THRESHOLD, 255, cv2.THRESH_BINARY, dst=changed,
+        )
+        if previous_changed is None:
             return
 
-        diff = cv2.absdiff(self._previous_frame_gray, gray)
-        motion_score = float(np.mean(diff))
+        motion_mask = cv2.bitwise_and(previous_changed, changed, dst=self._motion_buf)
+        cv2.bitwise_not(motion_mask, dst=motion_mask)
+        cv2.bitwise_and(changed, motion_mask, dst=motion_mask)
+        motion_score = 100.0 * cv2.countNonZero(motion_mask) / motion_mask.size
 
         if motion_score > threshold:
+            # The capture thread will reuse the ring buffer within a few
+            # decodes, so listeners get their own copy (motion frames only)
+            frame = frame.copy()
             for listener in self._motion_listeners:
                 try:
                     listener(motion_score, frame)
                 except Exception as e:
                     logger.error(f"Motion listener error: {e}")
 
-        self._previous_frame_gray = gray
-
     # --- Utilities ---
 
     @property
@@ -353,42 +662,60 @@ class OKamCamera:
         self.disconnect()
 
 
+def _probe_rtsp_pattern(ip_address: str, pattern: dict, timeout: int) -> Optional[dict]:
+    """Try one RTSP URL pattern. Returns the probe result dict, or None."""
+    url = f"rtsp://{ip_address}:{pattern['port']}/{pattern['path']}"
+    logger.info(f"Trying: {pattern['desc']} -> {url}")
+
+    cap = None
+    try:
+        cap = cv2.VideoCapture(url, cv2.CAP_FFMPEG)
+        _limit_capture_buffer(cap)
+        cap.set(cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, timeout * 1000)
+        cap.set(cv2.CAP_PROP_READ_TIMEOUT_MSEC, timeout * 1000)
+
+        if cap.isOpened():
+            ret, frame = cap.read()
+            if ret and frame is not None:
+                logger.info(f"SUCCESS: {pattern['desc']}")
+                return {
+                    "port": pattern["port"],
+                    "path": pattern["path"],
+                    "url": url,
+                    "description": pattern["desc"],
+                }
+    except Exception as e:
+        logger.debug(f"Failed: {e}")
+    finally:
+        if cap is not None:
+            cap.release()
+    return None
+
+
 def probe_camera_rtsp(ip_address: str, timeout: int = 5) -> Optional[dict]:
     """
     Probe a camera IP to find a working RTSP URL.
 
-    Tries common URL patterns and returns the first one that works.
+    Tries all common URL patterns concurrently and returns the first one
+    (in RTSP_URL_PATTERNS order) that works, so the probe takes about one
+    timeout rather than one per pattern.
     Returns a dict with port, path, and full URL, or None if nothing works.
     """
     if not CV2_AVAILABLE:
         logger.error("OpenCV required for camera probing")
         return None
 
-    os.environ["OPENCV_FFMPEG_CAPTURE_OPTIONS"] = "rtsp_transport;tcp"
-
-    for pattern in RTSP_URL_PATTERNS:
-        url = f"rtsp://{ip_address}:{pattern['port']}/{pattern['path']}"
-        logger.info(f"Trying: {pattern['desc']} -> {url}")
-
-        try:
-            cap = cv2.VideoCapture(url, cv2.CAP_FFMPEG)
-            cap.set(cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, timeout * 1000)
-            cap.set(cv2.CAP_PROP_READ_TIMEOUT_MSEC, timeout * 1000)
-
-            if cap.isOpened():
-                ret, frame = cap.read()
-                cap.release()
-                if ret and frame is not None:
-                    logger.info(f"SUCCESS: {pattern['desc']}")
-                    return {
-                        "port": pattern["port"],
-                        "path": pattern["path"],
-                        "url": url,
-                        "description": pattern["desc"],
-                    }
-            else:
-                cap.release()
-        except Exception as e:
-            logger.debug(f"Failed: {e}")
-
-    return None
+    executor = ThreadPoolExecutor(max_workers=len(RTSP_URL_PATTERNS))
+    try:
+        futures = [
+            executor.submit(_probe_rtsp_pattern, ip_address, pattern, timeout)
+            for pattern in RTSP_URL_PATTERNS
+        ]
+        for future in futures:
+            result = future.result()
+            if result:
+                return result
+        return None
+    finally:
+        # Don't wait for slower probes — each releases its own capture
+        executor.shutdown(wait=False, cancel_futures=True)
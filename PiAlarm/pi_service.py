@@ -32,7 +32,7 @@ os.chdir(os.path.dirname(os.path.abspath(__file__)))
 from zeroconf import ServiceInfo, Zeroconf
 
 from server import (
-    app, state, connect_hub, connect_camera,
+    state, run_server, connect_hub, connect_camera,
     start_monitor_thread, stop_monitor_thread, start_reconnect_thread, get_local_ip,
 )
 
@@ -58,7 +58,9 @@ def _register_mdns():
             properties={"path": "/"},
             server=f"{MDNS_NAME}.local.",
         )
-        _zeroconf = Zeroconf()
+        # Only the interface being advertised — skips opening multicast
+        # sockets on every adapter (VPNs, Docker bridges, ...)
+        _zeroconf = Zeroconf(interfaces=[local_ip])
         _zeroconf.register_service(info)
         logger.info(f"mDNS registered: http://{MDNS_NAME}.local:{PORT} ({local_ip})")
     except Exception as e:
@@ -119,7 +121,7 @@ def main():
 
     # Flask runs in the foreground — systemd keeps it alive
     try:
-        app.run(host="0.0.0.0", port=PORT, debug=False, use_reloader=False)
+        run_server(PORT)
     finally:
         _unregister_mdns()
         stop_monitor_thread()
@@ -5,8 +5,12 @@ Tuya devices expose their state via numbered "data points" (DPS).
 Mapping confirmed against a live AGSHome DP-W2.1 hub (protocol 3.4).
 """
 
+import base64
+import functools
 from enum import Enum
 
+_b64decode = base64.b64decode
+
 
 class AlarmMode(str, Enum):
     """Alarm operating modes (DPS 101 values, confirmed from live device)."""
@@ -46,6 +50,13 @@ DPS_NAMES = {
     DPS_NOTIFICATION: "Notification",
 }
 
+# Display position of each known DPS (unknown ones sort after, in hub order)
+DPS_ORDER = {index: pos for pos, index in enumerate(DPS_NAMES)}
+DPS_ORDER_UNKNOWN = len(DPS_ORDER)
+
+# DPS whose values are base64-encoded UTF-16 text
+_B64_DPS = frozenset({DPS_SENSOR_EVENT, DPS_NOTIFICATION})
+
 class VolumeLevel(str, Enum):
     """Volume levels (DPS 107 values, confirmed from live device)."""
     MUTE = "0"
@@ -68,36 +79,59 @@ VOLUME_LABELS = {
     VolumeLevel.HIGH: "High",
 }
 
+# Enum member -> raw DPS value to send (plain dict probe, no Enum descriptor)
+MODE_DPS_VALUE = {mode: mode.value for mode in AlarmMode}
+VOLUME_DPS_VALUE = {vol: vol.value for vol in VolumeLevel}
 
+# Raw DPS value -> label, so describe_dps() avoids the Enum constructor
+_MODE_LABEL_BY_VALUE = {mode.value: label for mode, label in MODE_LABELS.items()}
+_VOLUME_LABEL_BY_VALUE = {vol.value: label for vol, label in VOLUME_LABELS.items()}
+
+
+@functools.lru_cache(maxsize=64)
 def decode_utf16_base64(value: str) -> str:
-    """Decode a base64-encoded UTF-16 string from the hub."""
-    import base64
+    """
+    Decode a base64-encoded UTF-16 string from the hub.
+
+    Cached: a home has only a handful of sensor / notification strings,
+    so each distinct one is decoded once. value must be hashable (the hub
+    always sends these DPS as strings).
+    """
     try:
-        raw = base64.b64decode(value)
-        return raw.decode("utf-16-be").strip("\x00")
+        raw = _b64decode(value)
+        # Drop trailing NUL padding on the bytes; if that ate the zero high
+        # byte of the last real code unit (e.g. U+0100), give it back
+        end = len(raw.rstrip(b"\x00"))
+        end += end & 1
+        return raw[:end].decode("utf-16-be").lstrip("\x00")
     except Exception:
         return value
 
 
 def describe_dps(index: str, value) -> str:
     """Return a human-readable description of a DPS value."""
-    name = DPS_NAMES.get(str(index), f"DPS {index}")
-
-    if str(index) == DPS_ALARM_MODE:
-        try:
-            mode = AlarmMode(str(value))
-            return f"{name}: {MODE_LABELS[mode]}"
-        except ValueError:
-            pass
-
-    if str(index) == DPS_VOLUME:
-        try:
-            vol = VolumeLevel(str(value))
-            return f"{name}: {VOLUME_LABELS[vol]}"
-        except ValueError:
-            pass
-
-    if str(index) in (DPS_SENSOR_EVENT, DPS_NOTIFICATION):
+    sidx = index if type(index) is str else str(index)
+    if not isinstance(value, (str, int, bool)):
+        value = repr(value)  # unhashable (or unusual) values cache by repr
+    return _describe_cached(sidx, value)
+
+
+# typed=True keeps True/1 and False/0 apart — they format differently
+@functools.lru_cache(maxsize=256, typed=True)
+def _describe_cached(sidx: str, value) -> str:
+    name = DPS_NAMES.get(sidx) or f"DPS {sidx}"
+
+    if sidx == DPS_ALARM_MODE:
+        label = _MODE_LABEL_BY_VALUE.get(str(value))
+        if label is not None:
+            return f"{name}: {label}"
+
+    if sidx == DPS_VOLUME:
+        label = _VOLUME_LABEL_BY_VALUE.get(str(value))
+        if label is not None:
+            return f"{name}: {label}"
+
+    if sidx in _B64_DPS:
         decoded = decode_utf16_base64(str(value))
         return f"{name}: {decoded}"
 
@@ -16,10 +16,12 @@ Architecture (Pi-owned state machine):
     set_night_light()    — toggle night light (DPS 104)
 """
 
+import json
 import logging
+import select
 import threading
 import time
-from typing import Any, Callable, Optional
+from typing import Any, Callable, NamedTuple, Optional, Sequence
 
 import tinytuya
 
@@ -27,11 +29,30 @@ from .dps_map import (
     AlarmMode, VolumeLevel,
     DPS_ALARM_MODE, DPS_ALARM_TRIGGERED, DPS_SIREN,
     DPS_VOLUME, DPS_SENSOR_EVENT, DPS_NOTIFICATION,
+    DPS_ORDER, DPS_ORDER_UNKNOWN,
     describe_dps, decode_utf16_base64,
 )
 
 logger = logging.getLogger(__name__)
 
+# TinyTuya wizard output — where a rotated local key turns up
+DEVICES_FILE = "devices.json"
+
+# monitor_check_async() helpers: shared result for "nothing arrived" and a
+# sentinel so each DPS is probed with a single dict lookup
+_NO_EVENTS: tuple = ()
+_MISSING = object()
+
+# Shared read-only fallback for payloads without a "dps" key — never mutate
+_EMPTY_DPS: dict = {}
+
+
+class StatusResult(NamedTuple):
+    """Outcome of a hub status query (see AGSHomeHub.status_result)."""
+    ok: bool
+    dps: dict
+    error: Optional[str] = None
+
 
 class AGSHomeHub:
     """
@@ -60,11 +81,14 @@ class AGSHomeHub:
         self._device: Optional[tinytuya.Device] = None
         self._device_lock = threading.Lock()  # serialise all socket access
         self._last_status: dict = {}
+        self._key_rejected = False          # last _try_connect() got a 914
+        self._status_cache: dict = {}       # last successful status() result
+        self._status_cache_ts = 0.0         # time.monotonic() of that result
 
         # Monitor state
         self._monitor_active = False
         self._monitor_mode = ""           # "night", "silent_night", "dog_door", "away"
-        self._monitor_listeners: list[Callable] = []
+        self._monitor_listeners: tuple[Callable, ...] = ()  # copy-on-write
 
     # ------------------------------------------------------------------ #
     # Connection
@@ -74,14 +98,73 @@ class AGSHomeHub:
         """
         Connect to the hub on the local network.
 
-        Tries the configured IP first. If that fails, runs UDP discovery
-        to find the hub by device ID (handles DHCP address changes).
+        Tries the configured IP first. If the hub answers there but rejects
+        the local key (914 — it has rotated), re-reads the key from
+        devices.json. Otherwise listens for the hub's UDP broadcast to pick
+        up a DHCP address change; if the hub isn't heard at all, gives up
+        rather than also running a full deviceScan() (only TinyTuya versions
+        without find_device() still scan).
 
         Returns True on success.
         """
         if self._try_connect(self.ip_address):
             return True
+        if self._key_rejected:
+            return self._connect_with_rediscovered_key(self.ip_address)
+
+        if getattr(tinytuya, "find_device", None) is None:
+            return self._connect_by_scan()
+
+        logger.info("Configured IP failed, listening for hub broadcast...")
+        found_ip = self._find_device_ip()
+        if not found_ip:
+            logger.error("Hub connection failed (configured IP failed and hub not heard)")
+            return False
+        if found_ip != self.ip_address:
+            if self._try_connect(found_ip):
+                logger.info(f"Hub found at new IP: {found_ip}")
+                self.ip_address = found_ip
+                return True
+            if not self._key_rejected:
+                logger.error(f"Hub connection failed (heard at {found_ip} but not answering)")
+                return False
+        # The hub is there but won't talk to us — a rotated key is the likely cause
+        return self._connect_with_rediscovered_key(found_ip)
+
+    def _connect_with_rediscovered_key(self, ip: str) -> bool:
+        """Retry `ip` with the local key from devices.json, if it has changed."""
+        new_key = self._read_local_key()
+        if not new_key or new_key == self.local_key:
+            logger.error("Hub connection failed (local key rejected, no newer key in "
+                         f"{DEVICES_FILE} — re-run the TinyTuya wizard)")
+            return False
+        logger.info(f"Applying rotated local key from {DEVICES_FILE}")
+        self.local_key = new_key
+        if self._try_connect(ip):
+            self.ip_address = ip
+            return True
+        logger.error("Hub connection failed (rotated key also rejected)")
+        return False
+
+    def _read_local_key(self) -> Optional[str]:
+        """
+        Look this hub's local key up in devices.json (TinyTuya wizard output).
 
+        deviceScan() reports keys from the same file, so this is key
+        rediscovery without a network scan. Returns None if not found.
+        """
+        try:
+            with open(DEVICES_FILE) as f:
+                devices = json.load(f)
+        except (OSError, ValueError):
+            return None
+        for device in devices:
+            if device.get("id") == self.device_id:
+                return device.get("key")
+        return None
+
+    def _connect_by_scan(self) -> bool:
+        """Find the hub with a full deviceScan() (TinyTuya without find_device())."""
         logger.info("Configured IP failed, scanning network for hub...")
         discovered_ip, discovered_key = self._discover_device()
         if discovered_ip:
@@ -107,20 +190,46 @@ class AGSHomeHub:
             )
             result = device.status()
 
-            if "Error" in result or "Err" in result:
-                logger.warning(f"Connection to {ip} failed: {result}")
+            if "Error" in result:
+                # 914: the hub answered but rejected our local key
+                self._key_rejected = result.get("Err") == "914"
+                logger.warning("Connection to %s failed: %s", ip, result)
                 return False
 
             self._device = device
+            self._key_rejected = False
             self._last_status = result.get("dps", {})
+            # Seed the status cache, so a status(max_age=...) straight after
+            # connecting reuses this reply
+            self._status_cache = dict(self._last_status)
+            self._status_cache_ts = time.monotonic()
             logger.info(f"Hub connected at {ip} (v{self.version})")
             logger.info(f"Initial DPS: {self._last_status}")
             return True
 
         except Exception as e:
-            logger.warning(f"Connection to {ip} failed: {e}")
+            self._key_rejected = False
+            logger.warning("Connection to %s failed: %s", ip, e)
             return False
 
+    def _find_device_ip(self) -> Optional[str]:
+        """
+        Listen for this hub's UDP broadcast and return its IP.
+
+        Returns on the first packet carrying our device ID, rather than
+        collecting every device for the whole deviceScan() retry window.
+        Returns None if not heard (or TinyTuya predates find_device()).
+        """
+        find_device = getattr(tinytuya, "find_device", None)
+        if find_device is None:
+            return None
+        try:
+            found = find_device(dev_id=self.device_id)
+        except Exception as e:
+            logger.warning(f"Targeted discovery failed: {e}")
+            return None
+        return found.get("ip") if found else None
+
     def _discover_device(self) -> tuple[Optional[str], Optional[str]]:
         """
         Scan the local network for the hub by device ID via UDP broadcast.
@@ -151,39 +260,79 @@ class AGSHomeHub:
             except Exception:
                 pass
             self._device = None
+            self._invalidate_status_cache()
             logger.info("Hub disconnected.")
 
     def is_connected(self) -> bool:
         """Check if we have an active device handle."""
         return self._device is not None
 
+    @property
+    def pushes_reliable(self) -> bool:
+        """
+        Whether async pushes can be relied on to report changes.
+
+        Only true with a persistent socket: otherwise the connection is
+        closed after every call and monitor_check_async() listens in short
+        windows, so most pushes are missed and callers must poll.
+        """
+        return bool(self._device and getattr(self._device, "socketPersistent", False))
+
     # ------------------------------------------------------------------ #
     # Status
     # ------------------------------------------------------------------ #
 
-    def status(self) -> dict:
+    def status_result(self, max_age: float = 0.0) -> StatusResult:
         """
         Query the hub's current DPS state.
 
-        Returns a flat {dps_index: value} dict, or {"error": message} on failure.
+        Returns StatusResult(ok, dps, error): ok tells the two cases apart
+        without probing the dict. TinyTuya reports failures as
+        {"Error": ..., "Err": code, ...}, so the "Error" key alone
+        identifies them.
+
+        With max_age > 0, a successful result younger than max_age seconds
+        is returned without another round-trip to the hub. The cache is
+        dropped on every DPS write, async push and disconnect, so it never
+        outlives a change this hub object knows about.
         """
+        if max_age and time.monotonic() - self._status_cache_ts < max_age:
+            return StatusResult(True, self._status_cache)
         if not self._device:
-            return {"error": "Not connected"}
+            return StatusResult(False, _EMPTY_DPS, "Not connected")
         try:
             with self._device_lock:
                 result = self._device.status()
-            if "Error" in result or "Err" in result:
-                return {"error": str(result)}
-            return result.get("dps", {})
+            if "Error" in result:
+                return StatusResult(False, _EMPTY_DPS, str(result))
+            dps = result.get("dps", _EMPTY_DPS)
+            self._status_cache = dps
+            self._status_cache_ts = time.monotonic()
+            return StatusResult(True, dps)
         except Exception as e:
-            return {"error": str(e)}
+            return StatusResult(False, _EMPTY_DPS, str(e))
+
+    def _invalidate_status_cache(self):
+        """Forget the cached status_result() — the hub's DPS may have changed."""
+        self._status_cache_ts = 0.0
+
+    def status(self, max_age: float = 0.0) -> dict:
+        """
+        Query the hub's current DPS state.
+
+        Returns a flat {dps_index: value} dict, or {"error": message} on failure.
+        See status_result() for max_age.
+        """
+        res = self.status_result(max_age)
+        return res.dps if res.ok else {"error": res.error}
 
-    def status_pretty(self) -> list[str]:
-        """Return human-readable status lines."""
-        dps = self.status()
-        if "error" in dps:
-            return [f"Error: {dps['error']}"]
-        return [describe_dps(idx, val) for idx, val in sorted(dps.items())]
+    def status_pretty(self, max_age: float = 0.0) -> list[str]:
+        """Return human-readable status lines (see status_result() for max_age)."""
+        res = self.status_result(max_age)
+        if not res.ok:
+            return [f"Error: {res.error}"]
+        items = sorted(res.dps.items(), key=lambda kv: DPS_ORDER.get(kv[0], DPS_ORDER_UNKNOWN))
+        return [describe_dps(idx, val) for idx, val in items]
 
     # ------------------------------------------------------------------ #
     # Low-level DPS write
@@ -198,14 +347,14 @@ class AGSHomeHub:
             try:
                 result = self._device.set_value(index, value)
             except Exception as e:
-                logger.error(f"Failed to set DPS {index}: {e}")
+                logger.error("Failed to set DPS %s: %s", index, e)
                 return False
 
         # 914 = session key expired — reconnect outside the lock (network call)
         if isinstance(result, dict) and result.get("Err") == "914":
             logger.warning("Session expired (914) — reconnecting and retrying...")
             if not self.connect():
-                logger.error(f"Reconnection failed, could not set DPS {index}")
+                logger.error("Reconnection failed, could not set DPS %s", index)
                 return False
             with self._device_lock:
                 if not self._device:
@@ -213,9 +362,10 @@ class AGSHomeHub:
                 try:
                     result = self._device.set_value(index, value)
                 except Exception as e:
-                    logger.error(f"Failed to set DPS {index} after reconnect: {e}")
+                    logger.error("Failed to set DPS %s after reconnect: %s", index, e)
                     return False
 
+        self._invalidate_status_cache()
         logger.info(f"Set DPS {index} = {value} -> {result}")
         return True
 
@@ -236,10 +386,11 @@ class AGSHomeHub:
         reconnects immediately — every DPS 101 write rotates the session key.
         Returns True if already correct or successfully set.
         """
-        status = self.status()
-        if "error" in status:
-            logger.warning(f"ensure_home_muted: status error — {status['error']}")
+        res = self.status_result()
+        if not res.ok:
+            logger.warning(f"ensure_home_muted: status error — {res.error}")
             return False
+        status = res.dps
         mode = status.get(DPS_ALARM_MODE)
         volume = status.get(DPS_VOLUME)
         mode_changed = False
@@ -313,7 +464,7 @@ class AGSHomeHub:
         Register a callback for monitor events.
         Callback signature: callback(event_type, message)
         """
-        self._monitor_listeners.append(callback)
+        self._monitor_listeners = self._monitor_listeners + (callback,)
 
     def _notify_monitor(self, event_type: str, message: str):
         """Notify all monitor listeners."""
@@ -321,7 +472,7 @@ class AGSHomeHub:
             try:
                 listener(event_type, message)
             except Exception as e:
-                logger.error(f"Monitor listener error: {e}")
+                logger.error("Monitor listener error: %s", e)
 
     def start_monitor(self, mode: str):
         """
@@ -349,11 +500,51 @@ class AGSHomeHub:
         logger.info("Monitor stopped")
         self._notify_monitor("info", "Monitor stopped")
 
-    def monitor_check_async(self) -> list[dict]:
+    def _async_data_pending(self, timeout: float = 0.0) -> bool:
+        """
+        select() on the hub socket for up to `timeout` seconds (default: poll).
+
+        receive() is only worth calling when a push packet is waiting; once
+        it is, the 0.1s socket timeout just covers the rest of the frame.
+        Without an open socket there is nothing to select() on: sleep for
+        `timeout` instead and let receive() open one, so a listener thread
+        makes one short connection per wait rather than reconnecting back
+        to back.
+        """
+        sock = getattr(self._device, "socket", None)
+        if sock is None:
+            if timeout:
+                time.sleep(timeout)
+            return True
+        readable, _, _ = select.select([sock], [], [], timeout)
+        return bool(readable)
+
+    def _receive_push(self) -> Any:
+        """
+        receive() one pushed packet with a short socket timeout.
+
+        The device's own timeout is restored afterwards, so command replies
+        on the same device still get the full wait. Call with _device_lock held.
+        """
+        device = self._device
+        saved_timeout = device.connection_timeout
+        device.set_socketTimeout(0.1)
+        try:
+            return device.receive()
+        finally:
+            device.set_socketTimeout(saved_timeout)
+
+    def monitor_check_async(self, wait: float = 0.0) -> Sequence[dict]:
         """
-        Receive one async push packet from the hub (non-blocking, 0.1s timeout).
+        Receive one async push packet from the hub.
+
+        Non-blocking by default; pass `wait` to block up to that many seconds
+        for a packet (for a dedicated listener thread).
 
         Returns a list of event dicts: [{"type": str, "message": str, "dps": dict}]
+        (a shared empty tuple when nothing arrived).
+        Raises on socket or hub errors (including TinyTuya's {"Error": ...}
+        results) so the caller can back off.
 
         Event types:
             "sensor"       — DPS 116: sensor name
@@ -362,51 +553,59 @@ class AGSHomeHub:
             "siren"        — DPS 104: siren/night light state
             "notification" — DPS 121: hub notification string
         """
-        events = []
         if not self._device:
-            return events
-
-        try:
-            with self._device_lock:
-                self._device.set_socketTimeout(0.1)
-                data = self._device.receive()
-
-            if not data or not isinstance(data, dict):
-                return events
-
-            dps = data.get("dps", {})
-            if not dps and "data" in data:
-                dps = data["data"].get("dps", {})
-            if not dps:
-                return events
+            return _NO_EVENTS
 
-            logger.debug(f"Async DPS received: {dps}")
-
-            if DPS_SENSOR_EVENT in dps:
-                sensor_name = decode_utf16_base64(dps[DPS_SENSOR_EVENT])
-                events.append({"type": "sensor", "message": sensor_name, "dps": dps})
-                logger.info(f"Monitor: sensor event — {sensor_name}")
+        # Block outside the lock so commands aren't held up by the wait
+        if wait and not self._async_data_pending(wait):
+            return _NO_EVENTS
+        with self._device_lock:
+            if not self._async_data_pending():
+                return _NO_EVENTS
+            data = self._receive_push()
+
+        if not data or not isinstance(data, dict):
+            return _NO_EVENTS
+        if "Error" in data:
+            # TinyTuya reports connect/decode failures as a dict, not an exception
+            raise ConnectionError(data["Error"])
+
+        dps = data.get("dps", _EMPTY_DPS)
+        if not dps and "data" in data:
+            dps = data["data"].get("dps", _EMPTY_DPS)
+        if not dps:
+            return _NO_EVENTS
+
+        self._invalidate_status_cache()
+        logger.debug(f"Async DPS received: {dps}")
+        events = []
 
-            if DPS_NOTIFICATION in dps:
-                notification = decode_utf16_base64(dps[DPS_NOTIFICATION])
-                events.append({"type": "notification", "message": notification, "dps": dps})
+        sensor = dps.get(DPS_SENSOR_EVENT, _MISSING)
+        if sensor is not _MISSING:
+            sensor_name = decode_utf16_base64(sensor)
+            events.append({"type": "sensor", "message": sensor_name, "dps": dps})
+            logger.info(f"Monitor: sensor event — {sensor_name}")
 
-            if DPS_ALARM_TRIGGERED in dps:
-                triggered = dps[DPS_ALARM_TRIGGERED]
-                events.append({"type": "triggered", "message": str(triggered), "dps": dps})
-                logger.info(f"Monitor: DPS 103 triggered = {triggered}")
+        notification = dps.get(DPS_NOTIFICATION, _MISSING)
+        if notification is not _MISSING:
+            notification = decode_utf16_base64(notification)
+            events.append({"type": "notification", "message": notification, "dps": dps})
 
-            if DPS_ALARM_MODE in dps:
-                events.append({"type": "mode", "message": dps[DPS_ALARM_MODE], "dps": dps})
-                logger.info(f"Monitor: mode change — {dps[DPS_ALARM_MODE]}")
+        triggered = dps.get(DPS_ALARM_TRIGGERED, _MISSING)
+        if triggered is not _MISSING:
+            events.append({"type": "triggered", "message": str(triggered), "dps": dps})
+            logger.info(f"Monitor: DPS 103 triggered = {triggered}")
 
-            if DPS_SIREN in dps:
-                events.append({"type": "siren", "message": str(dps[DPS_SIREN]), "dps": dps})
+        mode_val = dps.get(DPS_ALARM_MODE, _MISSING)
+        if mode_val is not _MISSING:
+            events.append({"type": "mode", "message": mode_val, "dps": dps})
+            logger.info(f"Monitor: mode change — {mode_val}")
 
-            self._last_status.update(dps)
+        siren = dps.get(DPS_SIREN, _MISSING)
+        if siren is not _MISSING:
+            events.append({"type": "siren", "message": str(siren), "dps": dps})
 
-        except Exception:
-            pass
+        self._last_status.update(dps)
 
         return events
 
@@ -17,13 +17,15 @@ Usage:
 """
 
 import argparse
+import functools
 import json
 import logging
 import os
+import queue
+import re
 import sys
 import threading
 import time
-from datetime import datetime
 from typing import Optional
 
 logging.basicConfig(
@@ -54,12 +56,23 @@ from agshome.dps_map import (
 )
 
 
+# CONFIG_FILE path -> (mtime, parsed config)
+_config_cache: dict[str, tuple[float, dict]] = {}
+
+
 def load_config() -> dict:
-    """Load the combined config file."""
-    if os.path.exists(CONFIG_FILE):
-        with open(CONFIG_FILE) as f:
-            return json.load(f)
-    return {}
+    """Load the combined config file (re-parsed only when it changes)."""
+    try:
+        mtime = os.path.getmtime(CONFIG_FILE)
+    except OSError:
+        return {}
+    cached = _config_cache.get(CONFIG_FILE)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    with open(CONFIG_FILE) as f:
+        config = json.load(f)
+    _config_cache[CONFIG_FILE] = (mtime, config)
+    return config
 
 
 def create_hub(config: dict) -> Optional[AGSHomeHub]:
@@ -90,6 +103,14 @@ def create_hub(config: dict) -> Optional[AGSHomeHub]:
     )
 
 
+def _status_signature(status: dict) -> int:
+    """Order-independent hash of a DPS dict, to spot unchanged polls cheaply."""
+    sig = 0
+    for k, v in status.items():
+        sig ^= hash((k, v if isinstance(v, (str, int, bool, float)) else repr(v)))
+    return sig
+
+
 # ============================================================
 # Headless Mode
 # ============================================================
@@ -139,8 +160,38 @@ COL_MONITOR = "#6644cc"
 class SecurityDashboard:
     """Tkinter-based alarm hub dashboard."""
 
-    POLL_INTERVAL_MS = 2000
-    ASYNC_CHECK_MS = 500
+    POLL_INTERVAL_MS = 30000  # heartbeat only, while changes arrive as async pushes
+    POLL_NO_PUSH_MS = 2000    # poll rate while the hub can't push (no persistent socket)
+    POLL_HIDDEN_MS = 120000   # heartbeat while the window is minimised
+    POLL_ACTIVE_MS = 500      # after a polled change, backing off to POLL_INTERVAL_MS
+    POLL_IDLE_BACKOFF = 4     # unchanged polls before the interval doubles
+    ASYNC_WAIT_S = 0.5        # listener's wait per receive (the old timer's period)
+    ASYNC_MAX_BACKOFF_S = 5.0  # longest listener pause after repeated hub errors
+    STATUS_REUSE_S = 5.0      # _connect_hub reuses a status reply this fresh
+    LOG_MAX_LINES = 500   # event log cap — oldest LOG_TRIM_LINES dropped past it
+    LOG_TRIM_LINES = 100
+    LOG_FLUSH_MS = 50     # log lines are batched into one insert per flush
+
+    # Banner colour per hub mode
+    _MODE_COLOURS = {
+        AlarmMode.AWAY: COL_ARMED,
+        AlarmMode.HOME: COL_HOME,
+        AlarmMode.DISARMED: COL_DISARMED,
+    }
+
+    # Monitor event type -> log tag / log prefix
+    _EVENT_TAG_MAP = {
+        "sensor": "sensor",
+        "silence": "mode",
+        "rearm": "mode",
+        "info": "info",
+    }
+    _EVENT_PREFIX_MAP = {
+        "sensor": "SENSOR",
+        "silence": "MONITOR",
+        "rearm": "MONITOR",
+        "info": "MONITOR",
+    }
 
     # Known sensors (from user)
     SENSORS = [
@@ -156,6 +207,26 @@ class SecurityDashboard:
         self.running = False
         self._hub_connected = False
         self._last_status = {}
+        self._last_sig: Optional[int] = None  # _status_signature of _last_status
+        self._next_tick: dict[str, int] = {}  # periodic callback -> deadline (ns)
+        self._after_ids: dict[str, str] = {}  # callback -> pending after() id
+        self._ts_sec = -1                     # second _ts_text was formatted for
+        self._ts_text = ""
+        self._log_lines = 0                   # lines currently in the event log
+        self._log_pending: list = []          # insert() args queued for _flush_log
+        self._log_flush_due = False
+        # Worker threads post UI callables here; drained on the Tk thread
+        self._ui_queue: queue.SimpleQueue = queue.SimpleQueue()
+        # Set while a <<UiUpdate>> wake-up is on its way to the Tk thread
+        self._ui_wake_pending = False
+        self._ui_wake_lock = threading.Lock()
+        # Hub commands run one at a time on a single worker thread
+        self._hub_cmd_q: queue.Queue = queue.Queue()
+        self._hub_worker: Optional[threading.Thread] = None
+        self._async_listener: Optional[threading.Thread] = None
+        self._window_visible = True
+        self._poll_ms = self.POLL_INTERVAL_MS
+        self._idle_polls = 0
         self._build_gui()
 
     def _build_gui(self):
@@ -166,6 +237,9 @@ class SecurityDashboard:
         self.root.minsize(650, 500)
         self.root.configure(bg=BG_DARK)
         self.root.protocol("WM_DELETE_WINDOW", self._on_close)
+        self.root.bind("<Map>", self._on_map_change)
+        self.root.bind("<Unmap>", self._on_map_change)
+        self.root.bind("<<UiUpdate>>", self._drain_ui_queue)
 
         # --- Top: Alarm mode banner ---
         self.mode_frame = tk.Frame(self.root, bg=COL_DISARMED, height=70)
@@ -203,19 +277,19 @@ class SecurityDashboard:
 
         self.btn_away = tk.Button(
             ctrl_frame, text="ARM AWAY", bg="#cc3333", fg="white",
-            command=lambda: self._set_mode(AlarmMode.AWAY), **btn_cfg,
+            command=functools.partial(self._set_mode, AlarmMode.AWAY), **btn_cfg,
         )
         self.btn_away.pack(pady=(8, 3), padx=10)
 
         self.btn_home = tk.Button(
             ctrl_frame, text="ARM HOME", bg="#cc8800", fg="white",
-            command=lambda: self._set_mode(AlarmMode.HOME), **btn_cfg,
+            command=functools.partial(self._set_mode, AlarmMode.HOME), **btn_cfg,
         )
         self.btn_home.pack(pady=3, padx=10)
 
         self.btn_disarm = tk.Button(
             ctrl_frame, text="DISARM", bg="#339933", fg="white",
-            command=lambda: self._set_mode(AlarmMode.DISARMED), **btn_cfg,
+            command=functools.partial(self._set_mode, AlarmMode.DISARMED), **btn_cfg,
         )
         self.btn_disarm.pack(pady=3, padx=10)
 
@@ -224,13 +298,13 @@ class SecurityDashboard:
 
         self.btn_monitor = tk.Button(
             ctrl_frame, text="MONITOR", bg=COL_MONITOR, fg="white",
-            command=lambda: self._toggle_monitor(muted=False), **btn_cfg,
+            command=functools.partial(self._toggle_monitor, muted=False), **btn_cfg,
         )
         self.btn_monitor.pack(pady=(3, 3), padx=10)
 
         self.btn_day_monitor = tk.Button(
             ctrl_frame, text="DAY MONITOR", bg="#336655", fg="white",
-            command=lambda: self._toggle_monitor(muted=True), **btn_cfg,
+            command=functools.partial(self._toggle_monitor, muted=True), **btn_cfg,
         )
         self.btn_day_monitor.pack(pady=(3, 3), padx=10)
 
@@ -262,7 +336,15 @@ class SecurityDashboard:
             status = tk.Label(row, text="Idle", fg=FG_DIM, bg=BG_PANEL, font=("Helvetica", 9))
             status.pack(side=tk.RIGHT)
 
-            self.sensor_indicators[name] = {"dot": dot, "status": status, "row": row}
+            self.sensor_indicators[name] = {
+                "dot": dot, "status": status, "row": row, "reset_id": None,
+            }
+
+        # One regex search per sensor event instead of a substring scan per sensor
+        self._sensor_by_lower = {n.lower(): w for n, w in self.sensor_indicators.items()}
+        self._sensor_match = re.compile(
+            "|".join(re.escape(n) for n in self._sensor_by_lower)
+        )
 
         # Hub settings
         settings_frame = tk.LabelFrame(
@@ -320,10 +402,29 @@ class SecurityDashboard:
         self.ip_label.pack(side=tk.RIGHT, padx=10, pady=3)
 
     def _log_event(self, message: str, tag: str = "info"):
-        """Add a timestamped event to the log panel."""
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        self.log_text.insert(tk.END, f"[{timestamp}] ", "info")
-        self.log_text.insert(tk.END, f"{message}\n", tag)
+        """Add a timestamped event to the log panel (shown on the next flush)."""
+        # Bursts of events share a second — format the clock once per second
+        sec = int(time.time())
+        if sec != self._ts_sec:
+            self._ts_sec = sec
+            self._ts_text = time.strftime("[%H:%M:%S] ", time.localtime(sec))
+        self._log_pending.extend((self._ts_text, "info", f"{message}\n", tag))
+        self._log_lines += 1 + message.count("\n")
+        if not self._log_flush_due:
+            self._log_flush_due = True
+            self._after(self.LOG_FLUSH_MS, self._flush_log)
+
+    def _flush_log(self):
+        """Write every pending log line in one insert, then trim and scroll once."""
+        self._log_flush_due = False
+        if not self._log_pending:
+            return
+        self.log_text.insert(tk.END, *self._log_pending)
+        self._log_pending.clear()
+        if self._log_lines > self.LOG_MAX_LINES:
+            excess = self._log_lines - self.LOG_MAX_LINES + self.LOG_TRIM_LINES
+            self.log_text.delete("1.0", f"{excess + 1}.0")
+            self._log_lines -= excess
         self.log_text.see(tk.END)
 
     # --- Mode banner ---
@@ -337,18 +438,32 @@ class SecurityDashboard:
         try:
             mode = AlarmMode(str(mode_value))
             label = MODE_LABELS[mode]
-            colour = {
-                AlarmMode.AWAY: COL_ARMED,
-                AlarmMode.HOME: COL_HOME,
-                AlarmMode.DISARMED: COL_DISARMED,
-            }[mode]
+            colour = self._MODE_COLOURS[mode]
         except (ValueError, KeyError):
             label = f"UNKNOWN ({mode_value})"
             colour = FG_DIM
 
+        self._apply_banner_state(colour, label)
+
+    def _apply_banner_state(self, colour: str, label_text: Optional[str] = None,
+                            trig_text: Optional[str] = None, trig_fg: Optional[str] = None):
+        """
+        Set the banner colour (and optionally its texts) in one pass.
+
+        Each widget gets a single configure() call; Tk redraws the lot on the
+        next idle pass, which _drain_ui_queue already flushes once per batch.
+        """
         self.mode_frame.configure(bg=colour)
-        self.mode_label.configure(text=label, bg=colour)
-        self.triggered_label.configure(bg=colour)
+        if label_text is None:
+            self.mode_label.configure(bg=colour)
+        else:
+            self.mode_label.configure(text=label_text, bg=colour)
+        trig = {"bg": colour}
+        if trig_text is not None:
+            trig["text"] = trig_text
+        if trig_fg is not None:
+            trig["fg"] = trig_fg
+        self.triggered_label.configure(**trig)
 
     def _update_triggered_display(self, triggered: bool):
         """Show/hide the alarm triggered indicator."""
@@ -357,10 +472,8 @@ class SecurityDashboard:
             if self.hub.monitor_active:
                 self.triggered_label.configure(text="Sensor triggered — handling...", fg="white")
             else:
-                self.triggered_label.configure(text="ALARM TRIGGERED!", fg="white")
-                self.mode_frame.configure(bg=COL_TRIGGERED)
-                self.mode_label.configure(bg=COL_TRIGGERED)
-                self.triggered_label.configure(bg=COL_TRIGGERED)
+                self._apply_banner_state(COL_TRIGGERED, trig_text="ALARM TRIGGERED!",
+                                         trig_fg="white")
         else:
             self.triggered_label.configure(text="")
             # Restore monitor banner if still in monitor mode
@@ -371,16 +484,20 @@ class SecurityDashboard:
 
     def _flash_sensor(self, sensor_name: str):
         """Briefly highlight a sensor that has triggered."""
-        for name, widgets in self.sensor_indicators.items():
-            if name.lower() in sensor_name.lower():
-                widgets["dot"].configure(fg=COL_SENSOR)
-                widgets["status"].configure(text="TRIGGERED", fg=COL_SENSOR)
-                # Reset after 10 seconds
-                self.root.after(10000, lambda w=widgets: self._reset_sensor(w))
-                break
+        m = self._sensor_match.search(sensor_name.lower())
+        if m:
+            widgets = self._sensor_by_lower[m.group(0)]
+            widgets["dot"].configure(fg=COL_SENSOR)
+            widgets["status"].configure(text="TRIGGERED", fg=COL_SENSOR)
+            # Reset after 10 seconds — a repeat trigger restarts the one timer
+            if widgets.get("reset_id"):
+                self.root.after_cancel(widgets["reset_id"])
+            widgets["reset_id"] = self.root.after(
+                10000, functools.partial(self._reset_sensor, widgets))
 
     def _reset_sensor(self, widgets: dict):
         """Reset a sensor indicator to idle."""
+        widgets["reset_id"] = None
         widgets["dot"].configure(fg=FG_DIM)
         widgets["status"].configure(text="Idle", fg=FG_DIM)
 
@@ -410,78 +527,234 @@ class SecurityDashboard:
 
         if self.hub:
             self.ip_label.configure(text=f"Hub: {self.hub.ip_address}")
-            threading.Thread(target=self._connect_hub, daemon=True).start()
+            self._hub_worker = threading.Thread(target=self._hub_loop, daemon=True)
+            self._hub_worker.start()
+            self._run_on_hub(self._connect_hub)
+            self._async_listener = threading.Thread(target=self._listen_async, daemon=True)
+            self._async_listener.start()
         else:
             self._log_event("No hub configured")
 
-        self.root.after(self.POLL_INTERVAL_MS, self._poll_hub)
-        self.root.after(self.ASYNC_CHECK_MS, self._check_async)
+        self._after(self._poll_interval(), self._poll_hub)
+        # Anything posted before mainloop starts (see _post_ui)
+        self._after(0, self._drain_ui_queue)
 
         self.root.mainloop()
 
+    def _run_on_hub(self, fn, *args):
+        """Queue a blocking hub call for the hub worker thread."""
+        self._hub_cmd_q.put((fn, args))
+
+    def _hub_loop(self):
+        """Hub worker: run queued hub calls in order until stopped (None)."""
+        while True:
+            item = self._hub_cmd_q.get()
+            if item is None:
+                return
+            fn, args = item
+            try:
+                fn(*args)
+            except Exception as e:
+                self._post_ui(lambda e=e: self._log_event(f"Hub error: {e}", "alarm"))
+
     def _connect_hub(self):
-        """Connect to the alarm hub (background thread)."""
+        """Connect to the alarm hub (hub worker thread)."""
         original_ip = self.hub.ip_address
-        self.root.after(0, lambda: self._log_event(f"Connecting to hub at {original_ip}..."))
+        self._post_ui(lambda: self._log_event(f"Connecting to hub at {original_ip}..."))
 
         if self.hub.connect():
             self._hub_connected = True
             # Check if IP changed via discovery
             if self.hub.ip_address != original_ip:
-                self.root.after(0, lambda: self._log_event(
+                self._post_ui(lambda: self._log_event(
                     f"Hub IP changed: {original_ip} → {self.hub.ip_address}", "mode"))
-                self.root.after(0, lambda: self.ip_label.configure(
+                self._post_ui(lambda: self.ip_label.configure(
                     text=f"Hub: {self.hub.ip_address}"))
-            self.root.after(0, lambda: self._log_event("Hub connected!", "mode"))
-            self.root.after(0, lambda: self.conn_label.configure(
+            self._post_ui(lambda: self._log_event("Hub connected!", "mode"))
+            self._post_ui(lambda: self.conn_label.configure(
                 text="Connected", fg=COL_DISARMED,
             ))
 
-            # Read initial status
-            status = self.hub.status()
+            # Read initial status — connect() just fetched it, so reuse that
+            status = self.hub.status(max_age=self.STATUS_REUSE_S)
             if "error" not in status:
-                self._last_status = dict(status)
+                self._last_status = status
+                self._last_sig = _status_signature(status)
                 mode = status.get(DPS_ALARM_MODE, "?")
-                self.root.after(0, lambda m=mode: self._update_mode_display(m))
-                self.root.after(0, lambda s=status: self._update_settings(s))
+                self._post_ui(lambda m=mode: self._update_mode_display(m))
+                self._post_ui(lambda s=status: self._update_settings(s))
 
-                for line in self.hub.status_pretty():
-                    self.root.after(0, lambda l=line: self._log_event(l, "info"))
+                # One log entry for the whole dump, not a queued op per line
+                pretty = "\n".join(self.hub.status_pretty(max_age=self.STATUS_REUSE_S))
+                self._post_ui(functools.partial(self._log_event, pretty, "info"))
         else:
-            self.root.after(0, lambda: self._log_event("Hub connection failed!", "alarm"))
-            self.root.after(0, lambda: self.conn_label.configure(
+            self._post_ui(lambda: self._log_event("Hub connection failed!", "alarm"))
+            self._post_ui(lambda: self.conn_label.configure(
                 text="Connection failed", fg=COL_ARMED,
             ))
 
     def _poll_hub(self):
-        """Periodically poll the hub for status changes."""
+        """
+        Periodically poll the hub for status changes.
+
+        The status() round-trip runs on the hub worker, so the Tk thread
+        never waits on the hub (or on a reconnect holding it). The next poll
+        is scheduled once the result is back, so at most one is in flight.
+        """
         if not self.running:
             return
 
         if self._hub_connected and self.hub:
-            try:
-                status = self.hub.status()
-                if "error" not in status:
-                    self._process_status_changes(status)
-                    self._last_status = dict(status)
-            except Exception as e:
-                self._log_event(f"Poll error: {e}", "alarm")
+            self._run_on_hub(self._fetch_poll_status)
+        else:
+            self._schedule_poll()
 
-        self.root.after(self.POLL_INTERVAL_MS, self._poll_hub)
+    def _fetch_poll_status(self):
+        """Hub worker: read the status for _poll_hub and hand it to the Tk thread."""
+        try:
+            status = self.hub.status()
+        except Exception as e:
+            self._post_ui(functools.partial(self._log_event, f"Poll error: {e}", "alarm"))
+            status = None
+        self._post_ui(functools.partial(self._apply_poll_status, status))
 
-    def _check_async(self):
-        """Check for async push messages from the hub."""
+    def _apply_poll_status(self, status: Optional[dict]):
+        """Diff a polled status against the last one, then schedule the next poll."""
         if not self.running:
             return
-
-        if self._hub_connected and self.hub and self.hub._device:
-            events = self.hub.monitor_check_async()
+        if status is not None and "error" not in status:
+            # Usually nothing has changed — skip the per-key diff then
+            sig = _status_signature(status)
+            if sig != self._last_sig:
+                self._process_status_changes(status)
+                self._last_status = status  # fresh per call, never mutated
+                self._last_sig = sig
+                # The heartbeat caught something pushes didn't — look
+                # again soon, then back off while things stay quiet
+                self._poll_ms = self.POLL_ACTIVE_MS
+                self._idle_polls = 0
+            else:
+                self._idle_polls += 1
+                if self._idle_polls > self.POLL_IDLE_BACKOFF:
+                    self._poll_ms = min(self._poll_ms * 2, self.POLL_INTERVAL_MS)
+        self._schedule_poll()
+
+    def _poll_interval(self) -> int:
+        """
+        Milliseconds until the next _poll_hub.
+
+        The slow heartbeat only applies while the hub can push changes;
+        without a persistent socket most pushes are missed, so polling is
+        the only reliable source and runs at POLL_NO_PUSH_MS.
+        """
+        if not (self.hub and self.hub.pushes_reliable):
+            return min(self._poll_ms, self.POLL_NO_PUSH_MS)
+        return self._poll_ms if self._window_visible else self.POLL_HIDDEN_MS
+
+    def _schedule_poll(self):
+        """Queue the next _poll_hub: adaptive while shown, slow while minimised."""
+        self._after_periodic(self._poll_interval(), self._poll_hub)
+
+    def _on_map_change(self, event):
+        """Track whether the main window is shown, to slow the heartbeat when not."""
+        # Bindings on the root also fire for every child widget — only the
+        # toplevel itself says anything about minimising
+        if event.widget is self.root:
+            self._window_visible = event.type == tk.EventType.Map
+
+    def _listen_async(self):
+        """
+        Async listener thread: block on the hub socket and post pushes to the UI.
+
+        Replaces polling receive() from a Tk timer, so the Tk loop only wakes
+        for real pushes. With an open hub socket the thread sleeps in select()
+        until the hub sends something; without one (the hub's socket is not
+        persistent) it listens once per ASYNC_WAIT_S, as the timer did, and
+        catches only some pushes — _poll_hub then stays at POLL_NO_PUSH_MS.
+        """
+        failures = 0
+        while self.running:
+            if not (self._hub_connected and self.hub._device):
+                time.sleep(self.ASYNC_WAIT_S)
+                continue
+            try:
+                events = self.hub.monitor_check_async(wait=self.ASYNC_WAIT_S)
+            except Exception as e:
+                # Back off on a persistently failing hub: 1s, 2s, ... 5s
+                failures += 1
+                logger.warning(f"Async listener error ({failures} in a row): {e}")
+                time.sleep(min(self.ASYNC_MAX_BACKOFF_S, self.ASYNC_WAIT_S * 2 ** failures))
+                continue
+            failures = 0
             for event in events:
-                dps = event.get("dps", {})
+                dps = event.get("dps")
                 if dps:
-                    self._process_async_dps(dps)
-
-        self.root.after(self.ASYNC_CHECK_MS, self._check_async)
+                    self._post_ui(functools.partial(self._process_async_dps, dps))
+
+    def _post_ui(self, update):
+        """
+        Queue a UI update from a worker thread and wake the Tk loop for it.
+
+        Only the post that finds no wake-up pending generates <<UiUpdate>>,
+        so a burst of updates costs one event and an idle dashboard none.
+        """
+        self._ui_queue.put(update)
+        with self._ui_wake_lock:
+            if self._ui_wake_pending or not self.running:
+                return
+            self._ui_wake_pending = True
+        try:
+            self.root.event_generate("<<UiUpdate>>", when="tail")
+        except (tk.TclError, RuntimeError):
+            # Window closing, or mainloop not running yet — start() drains
+            # once it is, and the next post retries the wake-up
+            with self._ui_wake_lock:
+                self._ui_wake_pending = False
+
+    def _drain_ui_queue(self, event=None):
+        """Run every UI update posted by worker threads since the last wake-up."""
+        if not self.running:
+            return
+        # Cleared before draining: a post racing with the loop below then
+        # sends a fresh wake-up instead of being stranded in the queue
+        with self._ui_wake_lock:
+            self._ui_wake_pending = False
+        drained = False
+        while True:
+            try:
+                update = self._ui_queue.get_nowait()
+            except queue.Empty:
+                break
+            drained = True
+            try:
+                update()
+            except Exception as e:
+                logger.error(f"UI update error: {e}")
+        if drained:
+            # One layout/redraw pass for the whole batch
+            self.root.update_idletasks()
+
+    def _after_periodic(self, interval_ms: int, callback):
+        """
+        Reschedule a periodic callback against a fixed deadline.
+
+        after(interval) from the end of the callback adds the callback's own
+        run time to every period; stepping a monotonic deadline instead keeps
+        the rate steady. If more than a whole period behind, the deadline
+        resets to now rather than firing a burst of catch-up calls.
+        """
+        now = time.monotonic_ns()
+        step = interval_ms * 1_000_000
+        key = callback.__name__
+        deadline = self._next_tick.get(key, now) + step
+        if deadline < now - step:
+            deadline = now
+        self._next_tick[key] = deadline
+        self._after(max(1, (deadline - now) // 1_000_000), callback)
+
+    def _after(self, ms: int, callback):
+        """root.after(), remembering the id per callback so _on_close can cancel it."""
+        self._after_ids[callback.__name__] = self.root.after(ms, callback)
 
     def _process_status_changes(self, status: dict):
         """Detect and display changes from polled status."""
@@ -553,10 +826,7 @@ class SecurityDashboard:
 
         label = MODE_LABELS[mode]
         self._log_event(f"Setting mode: {label}...", "mode")
-        threading.Thread(
-            target=lambda: self.hub.set_mode(mode),
-            daemon=True,
-        ).start()
+        self._run_on_hub(self.hub.set_mode, mode)
 
     def _toggle_monitor(self, muted: bool = False):
         """Toggle monitor mode on/off."""
@@ -567,36 +837,22 @@ class SecurityDashboard:
         if self.hub.monitor_active:
             self._log_event("Stopping monitor mode...", "mode")
             self._update_monitor_button(False)
-            threading.Thread(target=self.hub.stop_monitor, daemon=True).start()
+            self._run_on_hub(self.hub.stop_monitor)
         else:
             label = "day monitor (muted)" if muted else "monitor"
             self._log_event(f"Starting {label} mode...", "mode")
             self._update_monitor_button(True, muted=muted)
 
             def on_monitor_event(event_type, message):
-                self.root.after(0, lambda: self._handle_monitor_event(event_type, message))
+                self._post_ui(functools.partial(self._handle_monitor_event, event_type, message))
 
             self.hub.add_monitor_listener(on_monitor_event)
-            threading.Thread(
-                target=lambda: self.hub.start_monitor(muted=muted),
-                daemon=True,
-            ).start()
+            self._run_on_hub(functools.partial(self.hub.start_monitor, muted=muted))
 
     def _handle_monitor_event(self, event_type: str, message: str):
         """Handle events from monitor mode."""
-        tag_map = {
-            "sensor": "sensor",
-            "silence": "mode",
-            "rearm": "mode",
-            "info": "info",
-        }
-        tag = tag_map.get(event_type, "info")
-        prefix = {
-            "sensor": "SENSOR",
-            "silence": "MONITOR",
-            "rearm": "MONITOR",
-            "info": "MONITOR",
-        }.get(event_type, "MONITOR")
+        tag = self._EVENT_TAG_MAP.get(event_type, "info")
+        prefix = self._EVENT_PREFIX_MAP.get(event_type, "MONITOR")
         self._log_event(f"{prefix}: {message}", tag)
 
     def _toggle_night_light(self):
@@ -609,10 +865,7 @@ class SecurityDashboard:
         state = self._night_light_on
         self._log_event(f"Night light {'ON' if state else 'OFF'}...", "info")
         self._update_night_light_button(state)
-        threading.Thread(
-            target=lambda: self.hub.set_night_light(state),
-            daemon=True,
-        ).start()
+        self._run_on_hub(self.hub.set_night_light, state)
 
     def _update_night_light_button(self, on: bool):
         """Update the night light button appearance."""
@@ -629,15 +882,11 @@ class SecurityDashboard:
             if muted:
                 self.btn_day_monitor.configure(text="DAY MONITOR (ON)", bg="#44aa77")
                 self.btn_monitor.configure(text="MONITOR", bg=COL_MONITOR)
-                self.mode_frame.configure(bg="#336655")
-                self.mode_label.configure(text="DAY MONITOR", bg="#336655")
-                self.triggered_label.configure(text="Silent tracking (muted)", bg="#336655")
+                self._apply_banner_state("#336655", "DAY MONITOR", "Silent tracking (muted)")
             else:
                 self.btn_monitor.configure(text="MONITOR (ON)", bg="#8866ee")
                 self.btn_day_monitor.configure(text="DAY MONITOR", bg="#336655")
-                self.mode_frame.configure(bg=COL_MONITOR)
-                self.mode_label.configure(text="MONITOR", bg=COL_MONITOR)
-                self.triggered_label.configure(text="Silent sensor tracking", bg=COL_MONITOR)
+                self._apply_banner_state(COL_MONITOR, "MONITOR", "Silent sensor tracking")
         else:
             self.btn_monitor.configure(text="MONITOR", bg=COL_MONITOR)
             self.btn_day_monitor.configure(text="DAY MONITOR", bg="#336655")
@@ -645,8 +894,19 @@ class SecurityDashboard:
     def _on_close(self):
         """Clean shutdown."""
         self.running = False
+        self._hub_cmd_q.put(None)  # stop the hub worker
+        # Cancel pending timers so none fire against destroyed widgets
+        pending = list(self._after_ids.values())
+        pending += [w["reset_id"] for w in self.sensor_indicators.values() if w["reset_id"]]
+        for after_id in pending:
+            try:
+                self.root.after_cancel(after_id)
+            except tk.TclError:
+                pass
+        self._after_ids.clear()
         if self.hub:
             self.hub.disconnect()
+        self.root.quit()
         self.root.destroy()
 
 
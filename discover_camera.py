@@ -12,17 +12,21 @@ Usage:
     python discover_camera.py                          # Scan network
     python discover_camera.py --ip 192.168.1.100       # Test specific IP
     python discover_camera.py --ip 192.168.1.100 --show  # Show live preview
+    python discover_camera.py --scan-timeout 0.5       # Faster scan on a quiet LAN
 """
 
 import argparse
 import json
 import logging
 import os
+import selectors
 import socket
+import struct
 import subprocess
 import sys
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from camera import FFMPEG_CAPTURE_OPTIONS
 
 logging.basicConfig(
     level=logging.INFO,
@@ -33,9 +37,15 @@ logger = logging.getLogger(__name__)
 
 CONFIG_FILE = "config.json"
 
+# FFMPEG RTSP options, shared with camera.py — read when a capture is opened
+os.environ.setdefault("OPENCV_FFMPEG_CAPTURE_OPTIONS", FFMPEG_CAPTURE_OPTIONS)
+
 # Ports commonly used by IP cameras for RTSP
 RTSP_PORTS = [554, 8554, 10555]
 
+# SO_LINGER {on, 0s}: close() sends RST, so scan sockets skip TIME_WAIT
+LINGER_RESET = struct.pack("ii", 1, 0)
+
 
 def get_local_subnet() -> str:
     """Detect the local subnet (e.g. '192.168.1')."""
@@ -53,16 +63,54 @@ def get_local_subnet() -> str:
 def check_port(ip: str, port: int, timeout: float = 1.0) -> bool:
     """Check if a TCP port is open on an IP address."""
     try:
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(timeout)
-        result = sock.connect_ex((ip, port))
-        sock.close()
-        return result == 0
-    except Exception:
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, LINGER_RESET)
+            sock.settimeout(timeout)
+            return sock.connect_ex((ip, port)) == 0
+    except OSError:
         return False
 
 
-def scan_for_cameras(subnet: str = None) -> list[dict]:
+def _scan_port(ips: list[str], port: int, timeout: float) -> list[str]:
+    """
+    Check one port across many hosts with non-blocking connects.
+
+    All connects are started at once and a single selector waits for them,
+    so the whole batch takes roughly one timeout. Returns the IPs that
+    accepted the connection.
+    """
+    sel = selectors.DefaultSelector()
+    socks = []  # every socket created, so the finally can close them all
+    open_ips = []
+    try:
+        for ip in ips:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            socks.append(sock)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, LINGER_RESET)
+            sock.setblocking(False)
+            sock.connect_ex((ip, port))
+            sel.register(sock, selectors.EVENT_WRITE, ip)
+
+        deadline = time.time() + timeout
+        while sel.get_map():
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            for key, _ in sel.select(timeout=remaining):
+                sock = key.fileobj
+                if sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR) == 0:
+                    open_ips.append(key.data)
+                sel.unregister(sock)
+                sock.close()
+    finally:
+        # Also covers a setsockopt()/connect_ex() failure mid-setup
+        for sock in socks:
+            sock.close()
+        sel.close()
+    return open_ips
+
+
+def scan_for_cameras(subnet: str = None, timeout: float = 1.0) -> list[dict]:
     """
     Scan the local network for devices with open RTSP ports.
 
@@ -74,27 +122,19 @@ def scan_for_cameras(subnet: str = None) -> list[dict]:
     print(f"\nScanning {subnet}.1-254 for RTSP-capable devices...")
     print(f"Checking ports: {RTSP_PORTS}\n")
 
-    found = []
+    ips = [f"{subnet}.{i}" for i in range(1, 255)]
+    open_ports: dict[str, list[int]] = {}
+    # One batch per port keeps each selector under Windows' 512-socket limit
+    for port in RTSP_PORTS:
+        for ip in _scan_port(ips, port, timeout):
+            open_ports.setdefault(ip, []).append(port)
 
-    def check_host(ip):
-        open_ports = []
-        for port in RTSP_PORTS:
-            if check_port(ip, port):
-                open_ports.append(port)
-        if open_ports:
-            return {"ip": ip, "ports": open_ports}
-        return None
-
-    with ThreadPoolExecutor(max_workers=50) as executor:
-        futures = {
-            executor.submit(check_host, f"{subnet}.{i}"): i
-            for i in range(1, 255)
-        }
-        for future in as_completed(futures):
-            result = future.result()
-            if result:
-                found.append(result)
-                print(f"  Found: {result['ip']} - open ports: {result['ports']}")
+    found = [
+        {"ip": ip, "ports": open_ports[ip]}
+        for ip in ips if ip in open_ports
+    ]
+    for result in found:
+        print(f"  Found: {result['ip']} - open ports: {result['ports']}")
 
     if not found:
         print("  No devices with open RTSP ports found.")
@@ -119,8 +159,11 @@ def show_live_preview(rtsp_url: str, camera_name: str = "O-KAM Camera"):
         print("OpenCV required for live preview. Install: pip install opencv-python")
         return
 
-    os.environ["OPENCV_FFMPEG_CAPTURE_OPTIONS"] = "rtsp_transport;tcp"
     cap = cv2.VideoCapture(rtsp_url, cv2.CAP_FFMPEG)
+    try:
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # show the newest frame, not a queued one
+    except Exception:
+        pass
 
     if not cap.isOpened():
         print(f"Could not open stream: {rtsp_url}")
@@ -181,6 +224,11 @@ def main():
         "--snapshot", type=str, default=None,
         help="Save a test snapshot to this file"
     )
+    parser.add_argument(
+        "--scan-timeout", type=float, default=1.0,
+        help="Seconds to wait for each port during the network scan "
+             "(lower skips slow responders sooner)"
+    )
     args = parser.parse_args()
 
     print("\n" + "=" * 60)
@@ -202,7 +250,7 @@ def main():
 
     if not target_ip:
         # Scan the network
-        devices = scan_for_cameras()
+        devices = scan_for_cameras(timeout=args.scan_timeout)
         if not devices:
             print("\nNo cameras found automatically.")
             print("If you know the camera IP, try: python discover_camera.py --ip <IP>")
@@ -253,12 +301,14 @@ def main():
         # Take test snapshot
         if args.snapshot:
             import cv2
-            os.environ["OPENCV_FFMPEG_CAPTURE_OPTIONS"] = "rtsp_transport;tcp"
             cap = cv2.VideoCapture(result["url"], cv2.CAP_FFMPEG)
             if cap.isOpened():
                 ret, frame = cap.read()
                 if ret:
-                    cv2.imwrite(args.snapshot, frame)
+                    cv2.imwrite(args.snapshot, frame, [
+                        int(cv2.IMWRITE_JPEG_QUALITY), 85,
+                        int(cv2.IMWRITE_JPEG_OPTIMIZE), 1,
+                    ])
                     print(f"  Snapshot saved: {args.snapshot}")
                 cap.release()
 
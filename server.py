@@ -17,17 +17,20 @@ Usage:
     python pi_service.py             # Production: run via systemd on Pi
 """
 
+import hashlib
 import json
 import logging
 import os
+import queue
 import socket
 import subprocess
 import threading
 import time
+import urllib.request
 from datetime import datetime
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
-from flask import Flask, jsonify, render_template, Response
+from flask import Flask, jsonify, render_template, request, Response
 
 from agshome.hub import AGSHomeHub
 from agshome.dps_map import (
@@ -35,15 +38,17 @@ from agshome.dps_map import (
     DPS_ALARM_TRIGGERED, DPS_ALARM_MODE, DPS_SIREN, DPS_VOLUME,
     DPS_SENSOR_EVENT, decode_utf16_base64,
 )
-from camera import OKamCamera, CameraConfig
 
-import requests as http_requests
+# camera (OpenCV, numpy) and requests are imported on first use —
+# they dominate start-up time on the Pi and aren't needed to serve the UI
+if TYPE_CHECKING:
+    from camera import OKamCamera
 
 try:
-    import cv2
-    CV2_AVAILABLE = True
+    from waitress import serve as waitress_serve
+    WAITRESS_AVAILABLE = True
 except ImportError:
-    CV2_AVAILABLE = False
+    WAITRESS_AVAILABLE = False
 
 logging.basicConfig(
     level=logging.INFO,
@@ -61,6 +66,10 @@ DEVICES_FILE = "devices.json"
 app = Flask(__name__)
 
 SIREN_DURATION = 30  # seconds the siren runs in Night mode before auto-silence
+MONITOR_WAIT_SECONDS = 0.3  # monitor loop's wait between hub receives
+MONITOR_MAX_BACKOFF = 5.0   # longest monitor-loop pause after repeated errors
+SSE_HEARTBEAT_SECONDS = 25  # idle /api/events streams send a keepalive this often
+SERVER_THREADS = 16  # waitress workers; each open stream holds one (see run_server)
 
 
 # ============================================================
@@ -72,6 +81,7 @@ class AppState:
 
     def __init__(self):
         self.lock = threading.Lock()
+        self.alert_cond = threading.Condition(self.lock)  # notified when alert_seq advances
         self.mode = "disarmed"            # disarmed/away/night/silent_night/dog_door
         self.night_light = False
         self.hub_connected = False
@@ -79,16 +89,20 @@ class AppState:
         self.last_sensor_time = ""
         self.alert_seq = 0                # incremented on each trigger (drives phone alert)
         self.hub: Optional[AGSHomeHub] = None
-        self.camera: Optional[OKamCamera] = None
+        self.camera: Optional["OKamCamera"] = None
         self.camera_connected = False
         self._monitor_running = False
         self._monitor_thread: Optional[threading.Thread] = None
+        # /api/status body, reused while the fields it is built from are unchanged
+        self._status_key: Optional[tuple] = None
+        self._status_body: bytes = b""
+        self._status_etag: str = ""
         self._poll_thread: Optional[threading.Thread] = None
         self._reconnect_in_progress: bool = False
         self.hub_connect_time: Optional[datetime] = None
         # Pi-owned siren state
         self._siren_running: bool = False
-        self._abort_siren: bool = False
+        self._abort_siren = threading.Event()  # set by disarm to cut the siren
 
 
 state = AppState()
@@ -103,6 +117,10 @@ _ntfy_server = "https://ntfy.sh"
 _ntfy_topic = ""
 _ntfy_priority_alert = 5   # urgent
 _ntfy_priority_status = 2  # low
+# Notifications are queued for one sender thread (see _ntfy_loop)
+_ntfy_q: queue.Queue = queue.Queue()
+_ntfy_worker: Optional[threading.Thread] = None
+_ntfy_worker_lock = threading.Lock()
 
 
 def _load_ntfy_config():
@@ -130,8 +148,35 @@ def send_ntfy(message: str, title: str = "AGSHome",
         return
     if priority is None:
         priority = _ntfy_priority_status
+    _start_ntfy_worker()
+    _ntfy_q.put((message, title, priority, tags))
 
-    def _send():
+
+def _start_ntfy_worker():
+    """Start the ntfy sender thread on first use."""
+    global _ntfy_worker
+    with _ntfy_worker_lock:
+        if _ntfy_worker is None:
+            _ntfy_worker = threading.Thread(target=_ntfy_loop, daemon=True)
+            _ntfy_worker.start()
+
+
+def _ntfy_loop():
+    """
+    ntfy sender thread: posts queued notifications in order.
+
+    One long-lived requests.Session keeps the HTTPS connection to the ntfy
+    server alive, so only the first notification pays for the TLS handshake.
+    Without requests installed it falls back to urllib, so alerts still go out.
+    """
+    try:
+        import requests as http_requests
+        session = http_requests.Session()
+    except ImportError:
+        logger.error("requests is not installed; sending ntfy alerts via urllib")
+        session = None
+    while True:
+        message, title, priority, tags = _ntfy_q.get()
         try:
             headers = {
                 "Title": title,
@@ -139,45 +184,59 @@ def send_ntfy(message: str, title: str = "AGSHome",
             }
             if tags:
                 headers["Tags"] = tags
-            http_requests.post(
-                f"{_ntfy_server}/{_ntfy_topic}",
-                data=message.encode("utf-8"),
-                headers=headers,
-                timeout=10,
-            )
+            url = f"{_ntfy_server}/{_ntfy_topic}"
+            data = message.encode("utf-8")
+            if session is not None:
+                session.post(url, data=data, headers=headers, timeout=10)
+            else:
+                req = urllib.request.Request(url, data=data, headers=headers)
+                with urllib.request.urlopen(req, timeout=10):
+                    pass
         except Exception as e:
             logger.warning(f"ntfy send failed: {e}")
 
-    threading.Thread(target=_send, daemon=True).start()
-
 
 # ============================================================
 # Hub Setup
 # ============================================================
 
+# JSON file path -> (mtime, parsed contents)
+_json_cache: dict[str, tuple[float, object]] = {}
+
+
+def _load_json_cached(path: str, default):
+    """Parse a JSON file, reusing the last parse while its mtime is unchanged."""
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return default
+    cached = _json_cache.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    with open(path) as f:
+        data = json.load(f)
+    _json_cache[path] = (mtime, data)
+    return data
+
+
 def load_config() -> dict:
-    """Load the combined config file."""
-    if os.path.exists(CONFIG_FILE):
-        with open(CONFIG_FILE) as f:
-            return json.load(f)
-    return {}
+    """Load the combined config file (re-parsed only when it changes)."""
+    return _load_json_cached(CONFIG_FILE, {})
 
 
 def create_hub(config: dict) -> Optional[AGSHomeHub]:
     """Create the alarm hub instance from config."""
     hc = config.get("hub", {})
     if not hc.get("device_id") or hc["device_id"].startswith("YOUR"):
-        if os.path.exists(DEVICES_FILE):
-            with open(DEVICES_FILE) as f:
-                devices = json.load(f)
-            if devices:
-                d = devices[0]
-                hc = {
-                    "device_id": d["id"],
-                    "ip_address": d.get("ip", ""),
-                    "local_key": d["key"],
-                    "protocol_version": float(d.get("version", 3.4)),
-                }
+        devices = _load_json_cached(DEVICES_FILE, [])
+        if devices:
+            d = devices[0]
+            hc = {
+                "device_id": d["id"],
+                "ip_address": d.get("ip", ""),
+                "local_key": d["key"],
+                "protocol_version": float(d.get("version", 3.4)),
+            }
 
     if not hc.get("device_id"):
         return None
@@ -190,11 +249,12 @@ def create_hub(config: dict) -> Optional[AGSHomeHub]:
     )
 
 
-def create_camera(config: dict) -> Optional[OKamCamera]:
+def create_camera(config: dict) -> Optional["OKamCamera"]:
     """Create camera instance from config."""
     cc = config.get("camera", {})
     if not cc.get("ip_address") or cc["ip_address"].startswith("YOUR"):
         return None
+    from camera import OKamCamera, CameraConfig
     cam_config = CameraConfig(
         name=cc.get("name", "O-KAM Camera"),
         ip_address=cc["ip_address"],
@@ -210,14 +270,15 @@ def create_camera(config: dict) -> Optional[OKamCamera]:
 
 def connect_camera():
     """Connect to the camera (called once at startup)."""
-    if not CV2_AVAILABLE:
-        logger.warning("OpenCV not available — camera disabled")
-        return
     config = load_config()
     camera = create_camera(config)
     if not camera:
         logger.info("No camera configured (check config.json)")
         return
+    from camera import CV2_AVAILABLE
+    if not CV2_AVAILABLE:
+        logger.warning("OpenCV not available — camera disabled")
+        return
 
     logger.info(f"Connecting to camera at {camera.config.ip_address}...")
     if camera.connect():
@@ -236,7 +297,7 @@ def connect_camera():
 def _stop_siren_if_running():
     """Signal the siren thread to stop (called by disarm)."""
     if state._siren_running:
-        state._abort_siren = True
+        state._abort_siren.set()
 
 
 def _run_night_siren():
@@ -249,13 +310,11 @@ def _run_night_siren():
     to HIGH so the next trigger will also sound (retriggerable).
     """
     state._siren_running = True
-    state._abort_siren = False
+    state._abort_siren.clear()
     try:
-        for _ in range(SIREN_DURATION):
-            if state._abort_siren:
-                logger.info("Night siren: aborted by disarm")
-                return
-            time.sleep(1)
+        if state._abort_siren.wait(SIREN_DURATION):
+            logger.info("Night siren: aborted by disarm")
+            return
         if state.hub:
             state.hub.silence_siren()
             state.hub._set_dps(DPS_VOLUME, VolumeLevel.HIGH.value)
@@ -264,7 +323,7 @@ def _run_night_siren():
         logger.error(f"Night siren error: {e}")
     finally:
         state._siren_running = False
-        state._abort_siren = False
+        state._abort_siren.clear()
 
 
 def _run_away_siren():
@@ -275,17 +334,16 @@ def _run_away_siren():
     volume — disarm restores MUTE permanently.
     """
     state._siren_running = True
-    state._abort_siren = False
+    state._abort_siren.clear()
     try:
-        while not state._abort_siren:
-            time.sleep(1)
+        state._abort_siren.wait()
         logger.info("Away siren: aborted by disarm")
         # Disarm will restore MUTE — nothing to do here
     except Exception as e:
         logger.error(f"Away siren error: {e}")
     finally:
         state._siren_running = False
-        state._abort_siren = False
+        state._abort_siren.clear()
 
 
 # ============================================================
@@ -307,11 +365,12 @@ def _handle_trigger(current_mode: str, sensor_name: str = ""):
         logger.debug("Trigger detected but siren already running — ignoring duplicate")
         return
 
-    now_str = datetime.now().strftime("%H:%M:%S")
+    now_str = time.strftime("%H:%M:%S")
     display_name = sensor_name if sensor_name else "Sensor triggered"
 
     with state.lock:
         state.alert_seq += 1
+        state.alert_cond.notify_all()
         state.last_sensor_time = now_str
         state.last_sensor_name = display_name
 
@@ -374,7 +433,12 @@ def _reflect_remote_action(hub_mode_val: str):
 
 def _monitor_loop():
     """
-    Background thread: receives async hub push events every 0.3s.
+    Background thread: listens for async push events from the hub.
+
+    The hub closes its socket between calls, so each pass waits
+    MONITOR_WAIT_SECONDS and then receive() listens briefly on a fresh
+    connection. If a socket is open, the wait is a select() on it instead
+    and returns as soon as the hub sends something.
 
     Uses receive() only — no status() calls on this socket. status() sends a
     new request on the same socket that receive() is listening on, which
@@ -383,38 +447,43 @@ def _monitor_loop():
     Only processes events when monitor_active — skips receive() entirely when
     disarmed to avoid unnecessary socket traffic.
     """
+    failures = 0
     while state._monitor_running:
-        if (state.hub and state.hub_connected and state.hub._device
+        if not (state.hub and state.hub_connected and state.hub._device
                 and state.hub.monitor_active):
-            try:
-                events = state.hub.monitor_check_async()
-                for event in events:
-
-                    if event["type"] == "sensor":
-                        sensor_name = event["message"]
-                        with state.lock:
-                            current_mode = state.mode
-                            state.last_sensor_name = sensor_name
-                        logger.info(f"Sensor push: {sensor_name} (mode: {current_mode})")
-                        _handle_trigger(current_mode, sensor_name)
+            time.sleep(0.3)
+            continue
+        try:
+            events = state.hub.monitor_check_async(wait=MONITOR_WAIT_SECONDS)
+            failures = 0
+            for event in events:
 
-                    elif event["type"] == "triggered" and event["message"] == "True":
-                        with state.lock:
-                            current_mode = state.mode
-                        logger.info(f"Trigger push: DPS 103=True (mode: {current_mode})")
-                        _handle_trigger(current_mode)
+                if event["type"] == "sensor":
+                    sensor_name = event["message"]
+                    with state.lock:
+                        current_mode = state.mode
+                        state.last_sensor_name = sensor_name
+                    logger.info(f"Sensor push: {sensor_name} (mode: {current_mode})")
+                    _handle_trigger(current_mode, sensor_name)
 
-                    elif event["type"] == "mode":
-                        _reflect_remote_action(event["message"])
+                elif event["type"] == "triggered" and event["message"] == "True":
+                    with state.lock:
+                        current_mode = state.mode
+                    logger.info(f"Trigger push: DPS 103=True (mode: {current_mode})")
+                    _handle_trigger(current_mode)
 
-                    elif event["type"] == "siren":
-                        with state.lock:
-                            state.night_light = event["message"] == "True"
+                elif event["type"] == "mode":
+                    _reflect_remote_action(event["message"])
 
-            except Exception as e:
-                logger.warning(f"Monitor loop error: {e}")
+                elif event["type"] == "siren":
+                    with state.lock:
+                        state.night_light = event["message"] == "True"
 
-        time.sleep(0.3)
+        except Exception as e:
+            # Back off on a persistently failing socket: 0.6s, 1.2s, ... 5s
+            failures += 1
+            logger.warning(f"Monitor loop error ({failures} in a row): {e}")
+            time.sleep(min(MONITOR_MAX_BACKOFF, 0.3 * 2 ** failures))
 
 
 def _poll_loop():
@@ -606,16 +675,28 @@ def connect_hub():
     threading.Thread(target=_connect_bg, daemon=True).start()
 
 
+_local_ip: Optional[str] = None
+
+
 def get_local_ip() -> str:
-    """Get the machine's LAN IP address."""
+    """
+    Get the machine's LAN IP address.
+
+    A successful lookup is cached for later callers; the 127.0.0.1 fallback
+    is not, so a call made before the network is up is retried next time.
+    """
+    global _local_ip
+    if _local_ip:
+        return _local_ip
     try:
         s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         s.connect(("8.8.8.8", 80))
         ip = s.getsockname()[0]
         s.close()
-        return ip
     except Exception:
         return "127.0.0.1"
+    _local_ip = ip
+    return ip
 
 
 # ============================================================
@@ -626,26 +707,73 @@ def get_local_ip() -> str:
 def add_no_cache(response):
     """Prevent aggressive mobile browser caching."""
     if "text/html" in response.content_type:
-        response.headers["Cache-Control"] = "no-cache, no-store, must-revalidate"
+        # Always revalidate, but allow storing so ETags (see _cached_page) work
+        response.headers["Cache-Control"] = "no-cache, must-revalidate"
         response.headers["Pragma"] = "no-cache"
         response.headers["Expires"] = "0"
     return response
 
 
+# template name -> (rendered HTML, ETag); the pages take no context
+_page_cache: dict[str, tuple[str, str]] = {}
+
+
+def _cached_page(template: str) -> Response:
+    """
+    Serve a static page template, rendered once per process.
+
+    The ETag lets the browser's must-revalidate check come back as a
+    bodyless 304 instead of the whole page.
+    """
+    cached = _page_cache.get(template)
+    if cached is None:
+        html = render_template(template)
+        cached = _page_cache[template] = (html, hashlib.sha1(html.encode()).hexdigest())
+    html, etag = cached
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = Response(html, mimetype="text/html")
+    response.set_etag(etag)
+    return response
+
+
 @app.route("/")
 def index():
-    return render_template("mobile.html")
+    return _cached_page("mobile.html")
 
 
 @app.route("/desktop")
 def desktop():
-    return render_template("desktop.html")
+    return _cached_page("desktop.html")
 
 
-@app.route("/api/status")
-def api_status():
-    with state.lock:
-        return jsonify({
+# {"ok": true, "mode": ...} bodies for the mode endpoints, serialised once
+_MODE_OK_BODIES = {
+    mode: json.dumps({"ok": True, "mode": mode}).encode()
+    for mode in ("disarmed", "away", "night", "silent_night", "dog_door")
+}
+
+
+def _mode_ok(mode: str) -> Response:
+    """JSON success response for a mode change."""
+    body = _MODE_OK_BODIES.get(mode) or json.dumps({"ok": True, "mode": mode}).encode()
+    return Response(body, mimetype="application/json")
+
+
+def _status_json() -> bytes:
+    """
+    Serialised status payload, rebuilt only when a reported field changes.
+
+    Caller must hold state.lock.
+    """
+    key = (
+        state.mode, state.night_light, state.hub_connected,
+        state.camera_connected, state.last_sensor_name,
+        state.last_sensor_time, state.alert_seq,
+    )
+    if key != state._status_key:
+        state._status_body = json.dumps({
             "mode": state.mode,
             "night_light": state.night_light,
             "hub_connected": state.hub_connected,
@@ -654,7 +782,51 @@ def api_status():
             "last_sensor_time": state.last_sensor_time,
             "alert_seq": state.alert_seq,
             "dog_door_active": state.mode == "dog_door",
-        })
+        }).encode()
+        state._status_etag = hashlib.sha1(state._status_body).hexdigest()[:16]
+        state._status_key = key
+    return state._status_body
+
+
+@app.route("/api/status")
+def api_status():
+    """
+    Current status as JSON, with an ETag so an unchanged poll is a bodyless
+    304 (fetch() hands the page the cached body as a normal 200).
+    """
+    with state.lock:
+        body = _status_json()
+        etag = state._status_etag
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = Response(body, mimetype="application/json")
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+@app.route("/api/events")
+def api_events():
+    """
+    Server-Sent Events stream: sends the status payload at once and again
+    whenever alert_seq advances, so clients learn of triggers without
+    polling. A comment line every SSE_HEARTBEAT_SECONDS keeps it open.
+    """
+    def generate():
+        last_seq = None
+        while True:
+            with state.alert_cond:
+                state.alert_cond.wait_for(
+                    lambda: state.alert_seq != last_seq, SSE_HEARTBEAT_SECONDS)
+                body = _status_json() if state.alert_seq != last_seq else None
+                last_seq = state.alert_seq
+            if body is None:
+                yield b": keepalive\n\n"
+            else:
+                yield b"data: " + body + b"\n\n"
+
+    return Response(generate(), mimetype="text/event-stream")
 
 
 @app.route("/api/disarm", methods=["POST"])
@@ -676,7 +848,7 @@ def api_disarm():
     with state.lock:
         state.mode = "disarmed"
     send_ntfy("Alarm disarmed", tags="unlock")
-    return jsonify({"ok": True, "mode": "disarmed"})
+    return _mode_ok("disarmed")
 
 
 @app.route("/api/away", methods=["POST"])
@@ -691,7 +863,7 @@ def api_away():
     with state.lock:
         state.mode = "away"
     send_ntfy("Alarm set to AWAY", tags="lock")
-    return jsonify({"ok": True, "mode": "away"})
+    return _mode_ok("away")
 
 
 @app.route("/api/night", methods=["POST"])
@@ -706,7 +878,7 @@ def api_night():
     with state.lock:
         state.mode = "night"
     send_ntfy("Night monitor active", tags="moon")
-    return jsonify({"ok": True, "mode": "night"})
+    return _mode_ok("night")
 
 
 @app.route("/api/silent_night", methods=["POST"])
@@ -721,7 +893,7 @@ def api_silent_night():
     with state.lock:
         state.mode = "silent_night"
     send_ntfy("Silent night active", tags="zzz")
-    return jsonify({"ok": True, "mode": "silent_night"})
+    return _mode_ok("silent_night")
 
 
 @app.route("/api/suspend", methods=["POST"])
@@ -746,7 +918,7 @@ def api_suspend():
 
     logger.info("Dog door: active (volume muted, ntfy-only mode)")
     send_ntfy("Dog door — alarm muted", tags="dog")
-    return jsonify({"ok": True, "mode": "dog_door"})
+    return _mode_ok("dog_door")
 
 
 @app.route("/api/suspend/cancel", methods=["POST"])
@@ -758,7 +930,7 @@ def api_suspend_cancel():
         return jsonify({"error": "Hub not connected"}), 503
     with state.lock:
         if state.mode != "dog_door":
-            return jsonify({"ok": True, "mode": state.mode})
+            return _mode_ok(state.mode)
         state.mode = "night"
 
     if state.hub:
@@ -767,7 +939,7 @@ def api_suspend_cancel():
 
     logger.info("Dog door cancelled — Night restored (volume HIGH)")
     send_ntfy("Dog door cancelled — Night restored", tags="lock")
-    return jsonify({"ok": True, "mode": "night"})
+    return _mode_ok("night")
 
 
 @app.route("/api/nightlight", methods=["POST"])
@@ -789,21 +961,22 @@ def api_camera_stream():
         return "Camera not connected", 503
 
     def generate():
+        seq = 0
         while True:
-            frame = state.camera.get_latest_frame()
-            if frame is None:
-                time.sleep(0.1)
-                continue
-            ret, jpeg = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, 70])
-            if not ret:
+            # Blocks until the capture thread publishes a new frame; the JPEG
+            # is encoded once and shared by every connected viewer
+            seq, jpeg = state.camera.wait_jpeg(seq, quality=70)
+            if not jpeg:
                 continue
+            # Header, payload and trailer as separate chunks — the (shared)
+            # JPEG is written as-is instead of copied into a new bytes
             yield (
                 b"--frame\r\n"
-                b"Content-Type: image/jpeg\r\n\r\n"
-                + jpeg.tobytes()
-                + b"\r\n"
+                b"Content-Type: image/jpeg\r\n"
+                b"Content-Length: %d\r\n\r\n" % len(jpeg)
             )
-            time.sleep(0.066)  # ~15 fps
+            yield jpeg
+            yield b"\r\n"
 
     return Response(
         generate(),
@@ -813,16 +986,22 @@ def api_camera_stream():
 
 @app.route("/api/camera/snapshot")
 def api_camera_snapshot():
-    """Single JPEG frame from the camera."""
+    """
+    Single JPEG frame from the camera.
+
+    While the live view is open, the frame already encoded for it is reused;
+    ?hq=1 always encodes a fresh, higher-quality frame.
+    """
     if not state.camera_connected or not state.camera:
         return "Camera not connected", 503
-    frame = state.camera.get_latest_frame()
-    if frame is None:
+    jpeg = b""
+    if request.args.get("hq") != "1":
+        jpeg = state.camera.cached_jpeg()
+    if not jpeg:
+        jpeg = state.camera.snapshot_bytes(quality=85)
+    if not jpeg:
         return "No frame available", 503
-    ret, jpeg = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
-    if not ret:
-        return "Encoding failed", 500
-    return Response(jpeg.tobytes(), mimetype="image/jpeg")
+    return Response(jpeg, mimetype="image/jpeg")
 
 
 @app.route("/api/test_alert", methods=["POST"])
@@ -831,8 +1010,9 @@ def api_test_alert():
     with state.lock:
         state.mode = "silent_night"
         state.last_sensor_name = "Test Sensor"
-        state.last_sensor_time = datetime.now().strftime("%H:%M:%S")
+        state.last_sensor_time = time.strftime("%H:%M:%S")
         state.alert_seq += 1
+        state.alert_cond.notify_all()
     logger.info("Test alert triggered")
     send_ntfy(
         "Test Sensor (silent_night)",
@@ -849,7 +1029,7 @@ def api_test_alert():
 
 @app.route("/service")
 def service_page():
-    return render_template("service.html")
+    return _cached_page("service.html")
 
 
 @app.route("/api/service/status")
@@ -916,6 +1096,30 @@ def api_service_logs():
 # Standalone Entry Point
 # ============================================================
 
+def run_server(port: int = 5000):
+    """
+    Serve the Flask app in the foreground (blocking).
+
+    Uses waitress when installed — a production WSGI server with HTTP/1.1
+    keep-alive and a worker pool, so long-lived MJPEG streams don't hold up
+    /api/status polls. Otherwise falls back to Flask's built-in server in
+    threaded mode.
+
+    Every open /api/camera/stream and /api/events response occupies a
+    waitress worker for as long as the client stays connected, so the pool
+    (SERVER_THREADS) is sized for several of both plus the short requests.
+    """
+    if WAITRESS_AVAILABLE:
+        logger.info(f"Serving on port {port} (waitress, {SERVER_THREADS} threads)")
+        waitress_serve(
+            app, host="0.0.0.0", port=port,
+            threads=SERVER_THREADS, connection_limit=200, channel_timeout=120,
+        )
+    else:
+        app.run(host="0.0.0.0", port=port, debug=False,
+                use_reloader=False, threaded=True)
+
+
 if __name__ == "__main__":
     connect_hub()       # non-blocking — starts background thread
     connect_camera()
@@ -924,7 +1128,7 @@ if __name__ == "__main__":
     print(f"  Desktop: http://agshome.local:5000/desktop")
     print(f"  (or by IP: http://{local_ip}:5000)\n")
     try:
-        app.run(host="0.0.0.0", port=5000, debug=False)
+        run_server(5000)
     except KeyboardInterrupt:
         pass
     finally:
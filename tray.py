@@ -9,6 +9,7 @@ Usage:
     pythonw tray.py         # Launch without console window
 """
 
+import functools
 import logging
 import os
 import socket
@@ -29,32 +30,41 @@ os.chdir(os.path.dirname(os.path.abspath(__file__)))
 from PIL import Image, ImageDraw, ImageFont
 import pystray
 from pystray import MenuItem, Menu
-from zeroconf import ServiceInfo, Zeroconf
 
-from server import (
-    app, state, connect_hub, connect_camera, start_monitor_thread,
-    stop_monitor_thread, start_reconnect_thread, get_local_ip,
-)
+# server (Flask, tinytuya) and zeroconf are imported in the startup thread,
+# once the tray icon is already showing — see setup()
 
 PORT = 5000
 MDNS_NAME = "agshome"
-_zeroconf: Zeroconf | None = None
+_zeroconf = None  # zeroconf.Zeroconf while registered
 
 
 # ============================================================
 # Tray Icon
 # ============================================================
 
+@functools.lru_cache(maxsize=1)
+def _icon_font():
+    """The icon's TrueType font, loaded once."""
+    try:
+        return ImageFont.truetype("arial.ttf", 36)
+    except (OSError, IOError):
+        return ImageFont.load_default()
+
+
+@functools.lru_cache(maxsize=2)
 def create_icon(connected: bool = False) -> Image.Image:
-    """Create a simple tray icon — green if connected, grey if not."""
+    """
+    Create a simple tray icon — green if connected, grey if not.
+
+    Each variant is drawn once and the same image returned after that;
+    don't draw on the result.
+    """
     size = 64
     colour = (68, 204, 68) if connected else (136, 136, 136)
     img = Image.new("RGB", (size, size), colour)
     draw = ImageDraw.Draw(img)
-    try:
-        font = ImageFont.truetype("arial.ttf", 36)
-    except (OSError, IOError):
-        font = ImageFont.load_default()
+    font = _icon_font()
     bbox = draw.textbbox((0, 0), "A", font=font)
     tw, th = bbox[2] - bbox[0], bbox[3] - bbox[1]
     draw.text(((size - tw) // 2, (size - th) // 2 - 2), "A", fill="white", font=font)
@@ -72,6 +82,8 @@ def on_open_browser(icon, item):
 
 def on_quit(icon, item):
     """Shut everything down."""
+    from server import state, stop_monitor_thread
+
     logger.info("Shutting down...")
     _unregister_mdns()
     stop_monitor_thread()
@@ -123,6 +135,9 @@ def toggle_auto_start(icon, item):
 def _register_mdns():
     """Advertise the server as agshome.local via mDNS."""
     global _zeroconf
+    from server import get_local_ip
+    from zeroconf import ServiceInfo, Zeroconf
+
     local_ip = get_local_ip()
     try:
         info = ServiceInfo(
@@ -133,7 +148,9 @@ def _register_mdns():
             properties={"path": "/"},
             server=f"{MDNS_NAME}.local.",
         )
-        _zeroconf = Zeroconf()
+        # Only the interface being advertised — skips opening multicast
+        # sockets on every adapter (VPNs, Docker bridges, ...)
+        _zeroconf = Zeroconf(interfaces=[local_ip])
         _zeroconf.register_service(info)
         logger.info(f"mDNS registered: http://{MDNS_NAME}.local:{PORT}")
     except Exception as e:
@@ -161,22 +178,18 @@ def setup(icon):
     icon.visible = True
 
     def _startup():
+        import server  # the slow import — Flask, tinytuya — happens here
+
+        # Flask server in daemon thread
+        threading.Thread(target=server.run_server, args=(PORT,), daemon=True).start()
+
         _register_mdns()
-        connect_hub()       # non-blocking — monitor/reconnect threads start on success
-        connect_camera()
+        server.connect_hub()    # non-blocking — monitor/reconnect threads start on success
+        server.connect_camera()
         logger.info(f"Server ready at http://{MDNS_NAME}.local:{PORT}")
 
     threading.Thread(target=_startup, daemon=True).start()
 
-    # Flask server in daemon thread
-    threading.Thread(
-        target=lambda: app.run(
-            host="0.0.0.0", port=PORT,
-            debug=False, use_reloader=False,
-        ),
-        daemon=True,
-    ).start()
-
 
 def build_menu():
     """Build the tray icon context menu."""